@@ -0,0 +1,194 @@
+"""
+Deterministic offline stand-ins for the pipeline's backends, for benchmarks.
+
+Plug them into DubbingEngine(transcriber=..., translation_backend=...,
+tts_generator=..., gender_classifier=...) to run the whole pipeline with no
+models and no network. make_transcript() and synthetic_soundtrack() share a
+seed, so a synthetic video's speech lines up with the transcript the fake
+Whisper returns for it.
+"""
+import io
+import time
+
+import numpy as np
+import soundfile as sf
+
+from src.audio_utils import decode_mp3
+
+WORDS = (
+    "the quick brown fox jumps over a lazy dog while we wait for the train "
+    "to arrive at noon because nobody really knows what happens next"
+).split()
+
+# Speaking rate used to size transcript lines
+WORDS_PER_SECOND = 2.5
+
+MALE_F0 = 120.0
+FEMALE_F0 = 210.0
+# Fake gender classifier threshold, between the two voices above
+MALE_BELOW_HZ = 165.0
+
+
+def make_transcript(duration, segments_per_minute=20, speakers=2, seed=0):
+    """
+    Whisper-like segments for duration seconds of speech: {"start", "end", "text", "speaker"}.
+    Lines get roughly even slots with jittered starts and lengths; speakers take turns
+    every few lines.
+    """
+    rng = np.random.default_rng(seed)
+    slot = 60.0 / segments_per_minute
+    segments = []
+    for k in range(int(duration / slot)):
+        start = k * slot + rng.uniform(0.0, 0.2) * slot
+        length = rng.uniform(0.5, 0.75) * slot
+        end = min(start + length, duration)
+        if end - start < 0.3:
+            break
+        words = rng.choice(WORDS, size=max(1, round((end - start) * WORDS_PER_SECOND)))
+        segments.append({
+            "start": round(start, 3),
+            "end": round(end, 3),
+            "text": " ".join(words).capitalize() + ".",
+            "speaker": (k // 3) % speakers,
+        })
+    return segments
+
+
+def speaker_f0(speaker, male_ratio=0.5, speakers=2):
+    # The first round(male_ratio * speakers) speakers get the low voice
+    return MALE_F0 if speaker < round(male_ratio * speakers) else FEMALE_F0
+
+
+def voiced_tone(seconds, sample_rate, f0, seed=0):
+    """
+    Harmonic tone with a syllable-rate envelope, enough to look like speech to
+    the pitch tracker, speaker clustering and the stretcher. float32 in [-1, 1].
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    freq = f0 * (1 + 0.04 * np.sin(2 * np.pi * 3 * t + rng.uniform(0, np.pi)))
+    phase = 2 * np.pi * np.cumsum(freq) / sample_rate
+    tone = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t) ** 2
+    return (0.25 * tone * envelope / 2.3).astype(np.float32)
+
+
+def synthetic_soundtrack(duration, sample_rate=16000, segments_per_minute=20, speakers=2, male_ratio=0.5, seed=0):
+    """
+    Soundtrack matching make_transcript(): a voiced tone per line at the speaker's
+    pitch, faint noise in between. Returns (audio float32, transcript).
+    """
+    transcript = make_transcript(duration, segments_per_minute, speakers, seed)
+    rng = np.random.default_rng(seed)
+    audio = 0.002 * rng.standard_normal(int(duration * sample_rate)).astype(np.float32)
+    for i, seg in enumerate(transcript):
+        start = int(seg["start"] * sample_rate)
+        tone = voiced_tone(seg["end"] - seg["start"], sample_rate, speaker_f0(seg["speaker"], male_ratio, speakers), seed + i)
+        audio[start:start + len(tone)] += tone[:len(audio) - start]
+    return audio, transcript
+
+
+class ScriptedTranscriber:
+    """
+    Stands in for Transcriber: returns make_transcript() for however much audio it
+    is given, so streaming windows get a transcript of their own length.
+    """
+
+    def __init__(self, segments_per_minute=20, speakers=2, seed=0, sample_rate=16000):
+        self.segments_per_minute = segments_per_minute
+        self.speakers = speakers
+        self.seed = seed
+        self.sample_rate = sample_rate
+        # Used in checkpoint keys, like Whisper's model size
+        self.model_size = f"scripted-{segments_per_minute}"
+
+    def transcribe(self, audio, language="en"):
+        if isinstance(audio, str):
+            audio, sr = sf.read(audio, dtype="float32")
+            duration = len(audio) / sr
+        else:
+            duration = len(audio) / self.sample_rate
+        return [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"]}
+            for seg in make_transcript(duration, self.segments_per_minute, self.speakers, self.seed)
+        ]
+
+
+class PseudoTranslator:
+    """
+    TextTranslator backend that 'translates' by repeating words until each line is
+    growth times longer (Spanish runs ~15-25% longer than English). Keeps one output
+    line per input line, so packed requests split back up.
+    """
+
+    def __init__(self, growth=1.2, latency=0.0):
+        self.growth = growth
+        self.latency = latency
+
+    def translate(self, text, source, target):
+        if self.latency:
+            time.sleep(self.latency)
+        lines = []
+        for line in text.split("\n"):
+            words = line.split()
+            extra = round(len(words) * (self.growth - 1))
+            lines.append(" ".join(words + words[:extra]))
+        return "\n".join(lines)
+
+
+class SyntheticTTS:
+    """
+    Stands in for TTSGenerator: a voiced tone lasting len(text) / chars_per_second
+    seconds, after an optional fake network latency. With mp3=True the tone makes a
+    round trip through MP3 like a real TTS reply, so decoding is measured too.
+    """
+
+    def __init__(self, chars_per_second=14.0, latency=0.0, f0=FEMALE_F0, mp3=False):
+        self.chars_per_second = chars_per_second
+        self.latency = latency
+        self.f0 = f0
+        self.mp3 = mp3
+
+    @property
+    def voice_settings(self):
+        return {"engine": "synthetic", "chars_per_second": self.chars_per_second, "f0": self.f0}
+
+    def synthesize(self, text, language, sample_rate=24000):
+        if not text or not text.strip():
+            return None
+        if self.latency:
+            time.sleep(self.latency)
+        seconds = max(len(text.strip()) / self.chars_per_second, 0.2)
+        tone = voiced_tone(seconds, sample_rate, self.f0, seed=len(text))
+        if self.mp3:
+            encoded = io.BytesIO()
+            sf.write(encoded, tone, 24000, format="MP3")
+            return decode_mp3(encoded.getvalue(), sample_rate)
+        return (tone * 32767).astype(np.int16)
+
+    def generate_audio(self, text, language, output_path):
+        samples = self.synthesize(text, language)
+        if samples is None:
+            return False
+        sf.write(output_path, samples, 24000, format="WAV", subtype="PCM_16")
+        return True
+
+
+def pitch_gender(speech, spans, sample_rate=16000):
+    """
+    Stands in for classify_gender_batch: labels each span by its autocorrelation
+    pitch, low voices male. Returns one (label, confidence) per span.
+    """
+    results = []
+    lag_min, lag_max = int(sample_rate / 400), int(sample_rate / 70)
+    for start, end in spans:
+        clip = np.asarray(speech[int(start * sample_rate):int(end * sample_rate)], dtype=np.float32)[:sample_rate]
+        if len(clip) <= lag_max:
+            results.append((None, 0.0))
+            continue
+        clip = clip - clip.mean()
+        spectrum = np.fft.rfft(clip, 2 * len(clip))
+        corr = np.fft.irfft(spectrum * np.conj(spectrum))[lag_min:lag_max]
+        f0 = sample_rate / (lag_min + int(np.argmax(corr)))
+        results.append(("male" if f0 < MALE_BELOW_HZ else "female", 0.9))
+    return results
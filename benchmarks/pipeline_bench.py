@@ -0,0 +1,148 @@
+"""
+End-to-end pipeline benchmark with offline backends.
+
+Generates synthetic videos of each length and line density, dubs them with
+DubbingEngine using the stand-ins in benchmarks/fakes.py (scripted Whisper,
+pseudo translator, synthetic TTS, pitch-based gender detection) and reports
+segments/sec, realtime factor, peak memory and where the time went. Needs
+ffmpeg, nothing else: no models, no network.
+
+    python benchmarks/pipeline_bench.py [--durations 30,120,600] [--density 10,30]
+        [--stream SECONDS] [--tts-latency 0.05] [--json results.json]
+
+Peak RSS is the process high-water mark, so cases run shortest first and each
+figure covers that case and everything before it.
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import ffmpeg
+import soundfile as sf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fakes import ScriptedTranscriber, PseudoTranslator, SyntheticTTS, pitch_gender, synthetic_soundtrack
+from src import profiling
+from src.dubber import DubbingEngine, output_paths
+
+# Stages shown in the per-case breakdown, in pipeline order
+STAGES = ("extract", "transcribe", "idioms", "genders", "translate", "synthesize", "assemble", "mux")
+
+
+def make_video(path, duration, segments_per_minute, speakers, male_ratio, seed=0):
+    """
+    Writes a tiny black video with a synthetic soundtrack. Returns the transcript.
+    """
+    audio, transcript = synthetic_soundtrack(duration, 16000, segments_per_minute, speakers, male_ratio, seed)
+    wav_path = os.path.splitext(path)[0] + ".wav"
+    sf.write(wav_path, audio, 16000, subtype="PCM_16")
+    video = ffmpeg.input(f"color=c=black:s=64x64:r=5:d={duration}", f="lavfi")
+    (
+        ffmpeg
+        .output(video, ffmpeg.input(wav_path), path, acodec="aac", shortest=None)
+        .run(overwrite_output=True, quiet=True)
+    )
+    os.remove(wav_path)
+    return transcript
+
+
+def run_case(work_dir, duration, density, args):
+    video_path = os.path.join(work_dir, f"bench_{int(duration)}s_{density}spm.mp4")
+    transcript = make_video(video_path, duration, density, args.speakers, args.male_ratio)
+    outputs = output_paths(video_path, args.langs)
+
+    # Fresh output dir per case: translation and TTS caches start empty
+    engine = DubbingEngine(
+        output_dir=os.path.join(work_dir, "out"),
+        cpu_workers=args.workers,
+        window_sec=args.stream,
+        checkpoints=False,
+        transcriber=ScriptedTranscriber(density, args.speakers),
+        translation_backend=PseudoTranslator(args.growth, args.translate_latency),
+        tts_generator=SyntheticTTS(args.chars_per_second, args.tts_latency, mp3=args.mp3),
+        gender_classifier=pitch_gender,
+    )
+    profiler = profiling.enable()
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(engine.process_languages(video_path, outputs))
+    finally:
+        profiling.disable()
+    elapsed = time.perf_counter() - started
+    summary = profiler.summary()
+    shutil.rmtree(os.path.join(work_dir, "out"), ignore_errors=True)
+    for path in [video_path, *outputs.values()]:
+        if os.path.exists(path):
+            os.remove(path)
+
+    segments = len(transcript) * len(args.langs)
+    return {
+        "duration": duration,
+        "density": density,
+        "segments": segments,
+        "ok": all(results.values()),
+        "seconds": elapsed,
+        "segments_per_second": segments / elapsed,
+        "realtime": duration * len(args.langs) / elapsed,
+        "peak_rss_mb": summary["peak_rss_mb"],
+        "children_peak_rss_mb": summary["children_peak_rss_mb"],
+        "stages": {name: summary["spans"][name]["wall_s"] for name in STAGES if name in summary["spans"]},
+        "subprocesses": sum(count for name, count in summary["counters"].items() if name.startswith("subprocess.")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dubbing pipeline offline")
+    parser.add_argument("--durations", default="30,120,600", help="Video lengths in seconds, comma separated")
+    parser.add_argument("--density", default="10,30", help="Transcript lines per minute, comma separated")
+    parser.add_argument("--langs", default="es", help="Target languages, comma separated")
+    parser.add_argument("--speakers", type=int, default=2, help="Number of speakers in the synthetic videos")
+    parser.add_argument("--male-ratio", type=float, default=0.5, help="Share of speakers with a low voice (dub gets converted to male)")
+    parser.add_argument("--growth", type=float, default=1.2, help="How much longer the pseudo translation is")
+    parser.add_argument("--chars-per-second", type=float, default=14.0, help="Speaking rate of the synthetic TTS")
+    parser.add_argument("--mp3", action="store_true", help="Send TTS audio through an MP3 encode/decode like a real TTS reply")
+    parser.add_argument("--tts-latency", type=float, default=0.0, help="Fake network latency per TTS request, seconds")
+    parser.add_argument("--translate-latency", type=float, default=0.0, help="Fake network latency per translation request, seconds")
+    parser.add_argument("--workers", type=int, help="CPU worker processes (default: one per core)")
+    parser.add_argument("--stream", type=float, help="Use streaming mode with windows of this many seconds")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    args.langs = [lang.strip() for lang in args.langs.split(",") if lang.strip()]
+
+    if args.male_ratio > 0 and importlib.util.find_spec("psola") is None:
+        print("psola not installed, skipping female->male conversion (--male-ratio 0)")
+        args.male_ratio = 0.0
+
+    cases = sorted(
+        (float(duration), int(density))
+        for duration in args.durations.split(",")
+        for density in args.density.split(",")
+    )
+    results = []
+    print(f"{'video':>7} {'lines/min':>9} {'segments':>9} {'seconds':>8} {'seg/s':>7} {'x realtime':>11} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for duration, density in cases:
+            result = run_case(work_dir, duration, density, args)
+            results.append(result)
+            status = "" if result["ok"] else "  FAILED"
+            print(
+                f"{duration:>6.0f}s {density:>9} {result['segments']:>9} {result['seconds']:>8.2f} "
+                f"{result['segments_per_second']:>7.1f} {result['realtime']:>11.1f} {result['peak_rss_mb'] or 0:>8.0f}{status}"
+            )
+            print("        " + "  ".join(f"{name} {seconds:.2f}" for name, seconds in result["stages"].items())
+                  + f"  | {result['subprocesses']} subprocesses")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+F0 tracker benchmark for the female->male conversion path.
+
+Times each tracker in utils.pitch on synthetic voiced clips with a known pitch
+contour (or on WAV files you pass in) and reports speed and accuracy against
+the reference. pyin is skipped when librosa isn't installed.
+
+    python benchmarks/pitch_bench.py [--seconds 5] [--clips 4] [file.wav ...]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.pitch import estimate_f0, FRAME_LENGTH
+
+SAMPLE_RATE = 24000
+
+# (name, method, analysis_rate)
+CONFIGS = [
+    ("pyin", "pyin", None),
+    ("yin", "yin", None),
+    ("yin@8k", "yin", 8000),
+]
+
+def synthetic_voice(seconds, sr, base_f0, seed=0):
+    """
+    Harmonic-rich 'voice' with vibrato, a slow glide and short pauses.
+    Returns (audio, f0 per sample, voiced mask per sample).
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = base_f0 * (1 + 0.05 * np.sin(2 * np.pi * 5 * t)) * (1 + 0.15 * t / seconds)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    audio = sum(np.sin(k * phase) / k for k in range(1, 8))
+    voiced = (t % 1.0) < 0.8
+    audio = audio * voiced + 0.003 * rng.standard_normal(len(t))
+    return (0.3 * audio / np.max(np.abs(audio))).astype(np.float32), f0, voiced
+
+def accuracy(estimate, f0, voiced, hop_length):
+    # Compare on frames that are voiced in the reference and voiced in the estimate
+    centers = np.minimum(np.arange(len(estimate)) * hop_length, len(f0) - 1)
+    reference = f0[centers]
+    mask = voiced[centers] & ~np.isnan(estimate)
+    if not mask.any():
+        return float("nan"), float("nan")
+    cents = np.abs(1200 * np.log2(estimate[mask] / reference[mask]))
+    # Off by more than a semitone counts as a gross error (octave jumps etc.)
+    return float(np.median(cents)), float(np.mean(cents > 100))
+
+def run(method, clips, analysis_rate=None):
+    hop_length = FRAME_LENGTH // 4
+    total_seconds = sum(len(audio) / sr for audio, sr, _, _ in clips)
+    errors, gross = [], []
+    # Warm up first so one-off imports (scipy.signal, librosa) aren't timed
+    estimate_f0(clips[0][0][:SAMPLE_RATE], clips[0][1], method=method, analysis_rate=analysis_rate)
+    started = time.perf_counter()
+    estimates = [estimate_f0(audio, sr, method=method, analysis_rate=analysis_rate) for audio, sr, _, _ in clips]
+    elapsed = time.perf_counter() - started
+    for estimate, (_, _, f0, voiced) in zip(estimates, clips):
+        if f0 is not None:
+            median, gross_rate = accuracy(estimate, f0, voiced, hop_length)
+            errors.append(median)
+            gross.append(gross_rate)
+    return {
+        "seconds": elapsed,
+        "realtime": total_seconds / elapsed if elapsed else float("inf"),
+        "median_cents": float(np.nanmean(errors)) if errors else None,
+        "gross_errors": float(np.nanmean(gross)) if gross else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark F0 trackers for female_to_male")
+    parser.add_argument("files", nargs="*", help="Optional WAV files to time (no accuracy without a reference)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of each synthetic clip")
+    parser.add_argument("--clips", type=int, default=4, help="Number of synthetic clips")
+    args = parser.parse_args()
+
+    clips = []
+    for i in range(args.clips):
+        audio, f0, voiced = synthetic_voice(args.seconds, SAMPLE_RATE, base_f0=170 + 30 * i, seed=i)
+        clips.append((audio, SAMPLE_RATE, f0, voiced))
+    for path in args.files:
+        audio, sr = sf.read(path, dtype="float32")
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+        clips.append((audio, sr, None, None))
+
+    try:
+        import librosa  # noqa: F401
+        has_librosa = True
+    except ImportError:
+        has_librosa = False
+
+    print(f"{'tracker':<10} {'seconds':>8} {'x realtime':>11} {'median cents':>13} {'gross err':>10}")
+    for name, method, analysis_rate in CONFIGS:
+        if method == "pyin" and not has_librosa:
+            print(f"{name:<10} skipped (librosa not installed)")
+            continue
+        result = run(method, clips, analysis_rate)
+        cents = "-" if result["median_cents"] is None else f"{result['median_cents']:.1f}"
+        gross = "-" if result["gross_errors"] is None else f"{result['gross_errors']:.1%}"
+        print(f"{name:<10} {result['seconds']:>8.3f} {result['realtime']:>11.1f} {cents:>13} {gross:>10}")
+
+if __name__ == "__main__":
+    main()
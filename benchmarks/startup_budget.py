@@ -0,0 +1,82 @@
+"""
+Startup budget check for the CLI and DubbingEngine.
+
+Runs each target in a fresh interpreter and reports wall time, peak RSS and
+whether any heavy ML library got imported. Exits non-zero if a budget is blown.
+
+    python benchmarks/startup_budget.py [--max-seconds 2.0] [--max-rss-mb 200]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Nothing on the startup path should pull these in; they belong to a pipeline stage
+HEAVY_MODULES = ("torch", "transformers", "whisper", "librosa", "psola")
+
+_REPORT_HEAVY = (
+    "import json, sys; "
+    "print(json.dumps([m for m in %r if m in sys.modules]))" % (HEAVY_MODULES,)
+)
+
+TARGETS = {
+    "import src.dubber": [sys.executable, "-c", "import src.dubber; " + _REPORT_HEAVY],
+    "main.py --help": [sys.executable, "main.py", "--help"],
+    "main.py missing input": [sys.executable, "main.py", "--input", "does-not-exist.mp4"],
+}
+
+def measure(argv):
+    """
+    Runs argv from the repo root and returns wall seconds, peak RSS in MB and stdout.
+    """
+    started = time.perf_counter()
+    proc = subprocess.Popen(argv, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    stdout = proc.stdout.read().decode("utf8", "replace")
+    proc.stdout.close()
+    # wait4 gives us the rusage of exactly this child
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, rss_mb, stdout
+
+def check_budget(max_seconds=2.0, max_rss_mb=200.0, targets=TARGETS):
+    """
+    Returns a list of (name, seconds, rss_mb, problems) for every target.
+    """
+    results = []
+    for name, argv in targets.items():
+        elapsed, rss_mb, stdout = measure(argv)
+        problems = []
+        if elapsed > max_seconds:
+            problems.append(f"took {elapsed:.2f}s > {max_seconds}s")
+        if rss_mb > max_rss_mb:
+            problems.append(f"peak RSS {rss_mb:.0f}MB > {max_rss_mb}MB")
+        lines = stdout.strip().splitlines()
+        if lines and lines[-1].startswith("["):
+            heavy = json.loads(lines[-1])
+            if heavy:
+                problems.append(f"imported {', '.join(heavy)}")
+        results.append((name, elapsed, rss_mb, problems))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import-time and memory budget of the CLI")
+    parser.add_argument("--max-seconds", type=float, default=2.0)
+    parser.add_argument("--max-rss-mb", type=float, default=200.0)
+    args = parser.parse_args()
+
+    failed = False
+    for name, elapsed, rss_mb, problems in check_budget(args.max_seconds, args.max_rss_mb):
+        status = "FAIL: " + "; ".join(problems) if problems else "ok"
+        print(f"{name:<24} {elapsed:6.2f}s {rss_mb:7.1f}MB  {status}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Sharded Whisper benchmark: realtime factor against the number of worker processes.
+
+Transcribes the same audio with Transcriber (one process) and with
+ShardedTranscriber at each worker count, optionally int8-quantized, and reports
+wall time, realtime factor and segment count. Worker start-up (loading the
+weights) is excluded. Needs whisper and torch.
+
+    python benchmarks/whisper_bench.py [--model small] [--workers 1,2,4,8] [--int8] [video or audio file]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.audio_utils import ingest_audio
+from src.transcriber import Transcriber, ShardedTranscriber
+
+
+def run(transcriber, audio):
+    # Warm up on a few seconds so model loading / worker start-up isn't timed
+    if hasattr(transcriber, "start"):
+        pool = transcriber.start()
+        list(pool.map(int, range(transcriber.workers)))
+    transcriber.transcribe(audio[:16000 * 5])
+    started = time.perf_counter()
+    segments = transcriber.transcribe(audio)
+    return time.perf_counter() - started, len(segments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded Whisper transcription")
+    parser.add_argument("input", nargs="?", default=os.path.join(ROOT, "test.mp4"), help="Video or audio file (default: test.mp4)")
+    parser.add_argument("--model", default="small", help="Whisper model size (default: small)")
+    parser.add_argument("--workers", default="1,2,4,8", help="Worker counts to try, comma separated")
+    parser.add_argument("--shard-sec", type=float, default=60.0, help="Shard length in seconds")
+    parser.add_argument("--int8", action="store_true", help="Also run every worker count with int8 quantization")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("whisper") is None or importlib.util.find_spec("torch") is None:
+        print("whisper and torch are needed for this benchmark")
+        return
+
+    audio, info = ingest_audio(args.input)
+    if audio is None:
+        return
+    seconds = len(audio) / 16000
+
+    configs = [("single process", Transcriber(args.model))]
+    for quantize in ([False, True] if args.int8 else [False]):
+        for workers in (int(w) for w in args.workers.split(",")):
+            name = f"{workers} worker(s){' int8' if quantize else ''}"
+            configs.append((name, ShardedTranscriber(args.model, workers, args.shard_sec, quantize=quantize)))
+
+    print(f"{seconds:.0f}s of audio, model {args.model}")
+    print(f"{'config':<20} {'seconds':>8} {'x realtime':>11} {'segments':>9}")
+    for name, transcriber in configs:
+        elapsed, count = run(transcriber, audio)
+        print(f"{name:<20} {elapsed:>8.2f} {seconds / elapsed:>11.2f} {count:>9}")
+        if hasattr(transcriber, "close"):
+            transcriber.close()
+
+if __name__ == "__main__":
+    main()
@@ -6,38 +6,119 @@ import sys
 # Add the src structure to path if needed, though running as python project_dubbing/main.py might need partial fixes
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.dubber import DubbingEngine
-
 def main():
     parser = argparse.ArgumentParser(description="Local Dubbing Tool")
-    parser.add_argument("--input", "-i", required=True, help="Input video file path")
-    parser.add_argument("--lang", "-l", default="es", help="Target language code (default: es)")
-    parser.add_argument("--output", "-o", help="Output video file path")
+    parser.add_argument("--input", "-i", help="Input video file path")
+    parser.add_argument("--lang", "-l", default="es", help="Target language code, or several separated by commas, e.g. es,hi,ru (default: es)")
+    parser.add_argument("--output", "-o", help="Output video file path (with several languages, the language is added to the name)")
+    parser.add_argument("--transcript", "-t", metavar="FILE",
+                        help="Subtitles (.srt, .vtt or Whisper .json) to use instead of transcribing with Whisper")
+    parser.add_argument("--stream", type=float, nargs="?", const=300.0, metavar="SECONDS",
+                        help="Process long videos in windows of SECONDS (default 300) to bound memory")
+    parser.add_argument("--audio-codec", default="aac", help="Audio encoder for the output, e.g. aac or libopus (default: aac)")
+    parser.add_argument("--audio-bitrate", help="Audio bitrate for the output, e.g. 128k")
+    parser.add_argument("--correct", nargs=2, action="append", metavar=("INDEX", "TEXT"), default=[],
+                        help="Replace the translation of segment INDEX (from 0) with TEXT, in the one --lang, and re-dub "
+                             "only that line; repeatable. Not with --stream")
+    parser.add_argument("--no-checkpoints", action="store_true", help="Don't reuse or save stage results between runs")
+    parser.add_argument("--transcribe-workers", type=int, metavar="N",
+                        help="Transcribe in shards on N worker processes (for CPU-only machines)")
+    parser.add_argument("--int8", action="store_true", help="Run Whisper with int8 dynamic quantization (CPU)")
+    parser.add_argument("--mix", action="store_true",
+                        help="Keep the original soundtrack (music, ambience) under the dub, turned down while lines are spoken")
+    parser.add_argument("--duck", type=float, default=18.0, metavar="DB",
+                        help="How many dB the original is turned down under dubbed lines with --mix (default: 18)")
+    parser.add_argument("--no-vad", action="store_true", help="Transcribe the whole soundtrack, not just the parts with speech")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Write per-stage timings to PATH (JSON) and a Chrome trace next to it")
+    parser.add_argument("--serve", action="store_true", help="Run as a service with warm models and a local job API")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to serve on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to serve on (default: 8765)")
+    parser.add_argument("--socket", help="Serve on this Unix socket instead of host:port")
+    parser.add_argument("--workers", type=int, default=1, help="Jobs processed at the same time when serving (default: 1)")
     
     args = parser.parse_args()
+
+    if args.serve:
+        from src.dubber import DubbingEngine
+        from src.server import serve
+        dubber = DubbingEngine(window_sec=args.stream, acodec=args.audio_codec, audio_bitrate=args.audio_bitrate,
+                               process_start_method="forkserver", checkpoints=not args.no_checkpoints,
+                               vad=not args.no_vad, transcribe_workers=args.transcribe_workers, quantize_whisper=args.int8,
+                               mix=args.mix, duck_db=-abs(args.duck))
+        try:
+            serve(dubber, args.host, args.port, args.socket, args.workers)
+        except KeyboardInterrupt:
+            print("\nServer stopped.")
+        return
+
+    if not args.input:
+        parser.error("--input is required unless --serve is given")
     
     input_file = args.input
     if not os.path.exists(input_file):
         print(f"Error: Input file '{input_file}' not found.")
         return
 
-    output_file = args.output
-    if not output_file:
-        base, ext = os.path.splitext(input_file)
-        output_file = f"{base}_dubbed_{args.lang}{ext}"
+    langs = [lang.strip() for lang in args.lang.split(",") if lang.strip()]
+    if args.correct:
+        # Segments are numbered per window in streaming mode, and TEXT is in one language
+        if args.stream:
+            parser.error("--correct can't be used with --stream")
+        if len(langs) != 1:
+            parser.error("--correct needs exactly one --lang, the language TEXT is in")
+        for index, _ in args.correct:
+            if not index.isdigit():
+                parser.error(f"--correct INDEX must be a segment number, got '{index}'")
+
+    transcript = None
+    if args.transcript:
+        # Parsed up front so a bad file fails before anything is decoded; it is
+        # checked against the video's duration once that is known
+        from src.subtitles import load_transcript
+        try:
+            transcript = load_transcript(args.transcript)
+        except (OSError, ValueError) as e:
+            print(f"Error: can't use transcript '{args.transcript}': {e}")
+            return
+
+    # Imported after the arguments are checked so --help and usage errors return immediately
+    from src.dubber import DubbingEngine, output_paths
+    outputs = output_paths(input_file, langs, args.output)
 
     print(f"Input: {input_file}")
-    print(f"Target Language: {args.lang}")
-    print(f"Output: {output_file}")
+    print(f"Target Language: {', '.join(langs)}")
+    for output_file in outputs.values():
+        print(f"Output: {output_file}")
+    
+    dubber = DubbingEngine(window_sec=args.stream, acodec=args.audio_codec, audio_bitrate=args.audio_bitrate,
+                           checkpoints=not args.no_checkpoints, vad=not args.no_vad,
+                           transcribe_workers=args.transcribe_workers, quantize_whisper=args.int8,
+                           mix=args.mix, duck_db=-abs(args.duck))
+    if args.correct and not dubber.checkpoints:
+        parser.error("--correct needs checkpoints")
+    for index, text in args.correct:
+        try:
+            dubber.correct_translation(input_file, langs[0], int(index), text, transcript)
+        except ValueError as e:
+            parser.error(f"--correct {index}: {e}")
     
-    dubber = DubbingEngine()
+    if args.profile:
+        from src import profiling
+        profiler = profiling.enable()
     
     try:
-        asyncio.run(dubber.process_video(input_file, args.lang, output_file))
+        # Transcription and the other language-independent stages run once for all languages
+        asyncio.run(dubber.process_languages(input_file, outputs, transcript=transcript))
     except KeyboardInterrupt:
         print("\nProcess interrupted.")
     except Exception as e:
         print(f"\nAn error occurred: {e}")
+    finally:
+        if args.profile:
+            profiling.disable()
+            summary_path, trace_path = profiler.write(args.profile)
+            print(f"Profile written to {summary_path} (trace: {trace_path})")
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,95 @@
+import io
 import os
 import wave
+import shutil
+import threading
+from math import gcd
 import ffmpeg
+import numpy as np
+import soundfile as sf
+
+# libsndfile 1.1+ reads MP3 itself, so TTS clips can be decoded without an ffmpeg per clip
+_SNDFILE_MP3 = "MP3" in sf.available_formats()
+
+def time_stretch(samples, target_length, sample_rate, frame_ms=40, tolerance_ms=10):
+    """
+    Changes the tempo of a PCM array without changing its pitch (WSOLA).
+    Returns a new array with exactly target_length samples and the input dtype.
+    Works on mono (n,) or multi-channel (n, channels) arrays.
+    """
+    samples = np.asarray(samples)
+    target_length = int(target_length)
+    if target_length <= 0 or len(samples) == 0:
+        return np.zeros((max(target_length, 0),) + samples.shape[1:], dtype=samples.dtype)
+    if target_length == len(samples):
+        return samples.copy()
+
+    work = samples.astype(np.float32)
+    mono = work if work.ndim == 1 else work.mean(axis=1)
+    speed = len(samples) / target_length
+
+    win = max(2 * (int(sample_rate * frame_ms / 1000) // 2), 4)
+    hop = win // 2
+    tol = max(int(sample_rate * tolerance_ms / 1000), 1)
+    # Periodic Hann windows at 50% overlap sum to one, so no renormalisation is needed.
+    window = np.hanning(win + 1)[:win].astype(np.float32)
+    if work.ndim > 1:
+        window = window[:, None]
+
+    # Lead-in of one hop so the first output frame isn't faded in,
+    # and enough tail that the last search region never runs off the end.
+    n_frames = (hop + target_length) // hop + 1
+    tail = int(np.ceil(n_frames * hop * speed)) + win + 2 * tol
+    pad = [(hop, tail)] + [(0, 0)] * (work.ndim - 1)
+    work = np.pad(work, pad)
+    mono = np.pad(mono, (hop, tail))
+
+    out = np.zeros((n_frames * hop + win,) + work.shape[1:], dtype=np.float32)
+    prev = 0
+    for k in range(n_frames):
+        nominal = max(hop + int(round((k - 1) * hop * speed)), 0)
+        if k == 0:
+            pos = nominal
+        else:
+            # Pick the frame near the nominal position that best continues the previous one
+            natural = prev + hop
+            template = mono[natural:natural + win]
+            lo = max(nominal - tol, 0)
+            region = mono[lo:nominal + tol + win]
+            corr = np.correlate(region, template, mode="valid")
+            pos = lo + int(np.argmax(corr))
+        out[k * hop:k * hop + win] += work[pos:pos + win] * window
+        prev = pos
+
+    out = out[hop:hop + target_length]
+    if np.issubdtype(samples.dtype, np.integer):
+        info = np.iinfo(samples.dtype)
+        out = np.clip(np.round(out), info.min, info.max)
+    return out.astype(samples.dtype)
+
+def decode_mp3(data, sample_rate=24000):
+    """
+    Decodes MP3 bytes (e.g. a TTS reply) to a mono int16 array at sample_rate.
+    In-process through libsndfile when it supports MP3, otherwise through pydub,
+    which starts ffmpeg for every call.
+    """
+    if not _SNDFILE_MP3:
+        from pydub import AudioSegment
+        from .timeline import audiosegment_to_array
+        return audiosegment_to_array(AudioSegment.from_file(io.BytesIO(data), format="mp3"), sample_rate)
+
+    audio, source_rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if source_rate != sample_rate:
+        import scipy.signal
+        common = gcd(source_rate, sample_rate)
+        audio = scipy.signal.resample_poly(audio, sample_rate // common, source_rate // common)
+    return np.clip(np.round(audio * 32768.0), -32768, 32767).astype(np.int16)
 
 def adjust_wav_speed(input_wav_path, target_duration_sec, overwrite_path=None):
     """
-    Adjusts the speed of a WAV file to match a target duration using FFmpeg.
+    Adjusts the speed of a WAV file to match a target duration.
+    Thin file wrapper around time_stretch.
     """
     if overwrite_path is None:
         overwrite_path = input_wav_path
@@ -14,46 +99,17 @@ def adjust_wav_speed(input_wav_path, target_duration_sec, overwrite_path=None):
         return
 
     try:
-        probe = ffmpeg.probe(input_wav_path)
-        current_duration = float(probe['format']['duration'])
-        
         if target_duration_sec <= 0:
             return 
+
+        info = sf.info(input_wav_path)
+        audio, sample_rate = sf.read(input_wav_path, dtype='float32')
+        target_length = int(round(target_duration_sec * sample_rate))
+        stretched = time_stretch(audio, target_length, sample_rate)
+
+        # Keep the original sample format (usually pcm_s16le)
+        sf.write(overwrite_path, stretched, sample_rate, subtype=info.subtype)
             
-        speed_factor = current_duration / target_duration_sec
-        
-        # Audioop is deprecated/removed in newer python, so we use ffmpeg atempo filter.
-        # atempo filter is limited to [0.5, 2.0]. We chain if needed.
-        
-        stream = ffmpeg.input(input_wav_path)
-        
-        remaining_factor = speed_factor
-        
-        # Chain filters if outside range
-        while remaining_factor > 2.0:
-            stream = stream.filter('atempo', 2.0)
-            remaining_factor /= 2.0
-            
-        while remaining_factor < 0.5:
-            stream = stream.filter('atempo', 0.5)
-            remaining_factor /= 0.5
-            
-        stream = stream.filter('atempo', remaining_factor)
-        
-        # Write to temp file then move if overwrite
-        temp_output = input_wav_path + ".temp.wav"
-        
-        # We need to preserve original format if possible, or just standard pcm_s16le
-        stream = stream.output(temp_output, acodec='pcm_s16le')
-        stream.run(overwrite_output=True, quiet=True)
-        
-        if os.path.exists(temp_output):
-            if os.path.exists(overwrite_path):
-                os.remove(overwrite_path)
-            os.rename(temp_output, overwrite_path)
-            
-    except ffmpeg.Error as e:
-        print(f"FFmpeg Error adjusting speed: {e.stderr.decode('utf8') if e.stderr else str(e)}")
     except Exception as e:
         print(f"Error adjusting WAV speed: {e}")
 
@@ -73,17 +129,30 @@ def extract_audio_from_video(input_video, output_audio, sample_rate=16000):
         print(f"FFmpeg Error: {e.stderr.decode('utf8')}")
         return False
 
-def merge_audio_video(video_path, audio_path, output_path):
+def merge_audio_video(video_path, audio, output_path, sample_rate=24000, acodec='aac', audio_bitrate=None):
     """
     Merges audio and video, replacing the original audio.
+    audio: a path to an audio file, or mono int16 PCM at sample_rate - one array or an
+    iterable of chunks - which is piped to ffmpeg's stdin while the video stream is copied,
+    so the dub never has to be written to disk.
+    acodec/audio_bitrate: audio encoder settings, e.g. 'aac' or 'libopus' and '128k'.
     """
+    if not isinstance(audio, str):
+        with AudioMuxer(video_path, output_path, sample_rate, acodec, audio_bitrate) as muxer:
+            for chunk in ([audio] if isinstance(audio, np.ndarray) else audio):
+                muxer.write(chunk)
+        return muxer.ok
+
+    audio_options = {'acodec': acodec}
+    if audio_bitrate:
+        audio_options['audio_bitrate'] = audio_bitrate
     try:
         video = ffmpeg.input(video_path)
-        audio = ffmpeg.input(audio_path)
+        audio = ffmpeg.input(audio)
         
         (
             ffmpeg
-            .output(video.video, audio, output_path, vcodec='copy', acodec='aac')
+            .output(video.video, audio, output_path, vcodec='copy', **audio_options)
             .run(cmd='ffmpeg', capture_stdout=True, capture_stderr=True, overwrite_output=True)
         )
         return True
@@ -91,6 +160,76 @@ def merge_audio_video(video_path, audio_path, output_path):
         print(f"FFmpeg Merge Error: {e.stderr.decode('utf8')}")
         return False
 
+class AudioMuxer:
+    """
+    Muxes PCM into a copy of video_path as it is produced: ffmpeg is started up front,
+    reading raw mono int16 audio from stdin, and each write() goes straight to it.
+    The mux finishes as soon as close() is called after the last samples.
+    """
+
+    def __init__(self, video_path, output_path, sample_rate=24000, acodec='aac', audio_bitrate=None):
+        self.output_path = output_path
+        self.sample_rate = sample_rate
+        self.frames = 0
+        self.ok = False
+        audio_options = {'acodec': acodec}
+        if audio_bitrate:
+            audio_options['audio_bitrate'] = audio_bitrate
+        video = ffmpeg.input(video_path)
+        audio = ffmpeg.input('pipe:', format='s16le', ac=1, ar=sample_rate)
+        self._process = (
+            ffmpeg
+            .output(video.video, audio, output_path, vcodec='copy', **audio_options)
+            .global_args('-loglevel', 'error')
+            .run_async(cmd='ffmpeg', pipe_stdin=True, pipe_stderr=True, overwrite_output=True)
+        )
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def write(self, samples):
+        samples = np.ascontiguousarray(samples, dtype=np.int16)
+        try:
+            self._process.stdin.write(samples.tobytes())
+        except BrokenPipeError:
+            # ffmpeg quit early; close() reports why
+            return
+        self.frames += len(samples)
+
+    def close(self):
+        if self._process.returncode is not None:
+            return self.ok
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = self._process.stderr.read()
+        self.ok = self._process.wait() == 0
+        if not self.ok:
+            print(f"FFmpeg Merge Error: {stderr.decode('utf8')}")
+        return self.ok
+
+    def abort(self):
+        """
+        Stops ffmpeg and removes the partial output.
+        """
+        if self._process.returncode is not None:
+            return
+        self._process.kill()
+        self._process.wait()
+        if os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
 def create_silent_wav(output_path, duration_sec, sample_rate=16000):
     with wave.open(output_path, "wb") as wf:
         wf.setnchannels(1)
@@ -101,22 +240,96 @@ def create_silent_wav(output_path, duration_sec, sample_rate=16000):
         data = b'\x00\x00' * num_frames
         wf.writeframes(data)
 
+def _probe_duration(probe):
+    video_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None)
+    if video_stream and 'duration' in video_stream:
+        return float(video_stream['duration'])
+    # Fallback if no video stream found or duration missing: use the format duration
+    return float(probe['format']['duration'])
+
 def get_video_duration(video_path):
     """
     Returns the duration of the video in seconds using ffmpeg probe.
     """
     try:
-        probe = ffmpeg.probe(video_path)
-        video_stream = next((stream for stream in probe['streams'] if stream['codec_type'] == 'video'), None)
-        if video_stream:
-            return float(video_stream['duration'])
-        else:
-            # Fallback if no video stream found or duration missing?
-            # Try format duration
-            return float(probe['format']['duration'])
+        return _probe_duration(ffmpeg.probe(video_path))
     except ffmpeg.Error as e:
         print(f"FFmpeg Probe Error: {e.stderr.decode('utf8')}")
         return None
     except Exception as e:
         print(f"Error getting video duration: {e}")
         return None
+
+def ingest_audio(video_path, sample_rate=16000, mmap_path=None):
+    """
+    One-pass ingest: probes the container once, then decodes the soundtrack with a
+    single ffmpeg process straight to mono float32 PCM on stdout (no temp WAV).
+    Every stage (Whisper, speaker/gender analysis) reads the returned array directly.
+
+    mmap_path: if given, the PCM is streamed to this raw file and returned as a
+    read-only np.memmap, so long tracks don't have to sit in RAM.
+    Returns (samples, info), info being {"duration", "sample_rate", "has_audio"};
+    samples is None if the audio couldn't be decoded.
+    """
+    try:
+        probe = ffmpeg.probe(video_path)
+    except ffmpeg.Error as e:
+        print(f"FFmpeg Probe Error: {e.stderr.decode('utf8')}")
+        return None, None
+    except Exception as e:
+        # e.g. ffprobe not installed
+        print(f"Error probing {video_path}: {e}")
+        return None, None
+
+    info = {
+        "duration": None,
+        "sample_rate": sample_rate,
+        "has_audio": any(stream['codec_type'] == 'audio' for stream in probe['streams']),
+    }
+    try:
+        info["duration"] = _probe_duration(probe)
+    except (KeyError, ValueError):
+        pass
+    if not info["has_audio"]:
+        print("No audio stream found.")
+        return None, info
+
+    try:
+        process = (
+            ffmpeg
+            .input(video_path)
+            .output('pipe:', format='f32le', acodec='pcm_f32le', ac=1, ar=sample_rate)
+            .global_args('-loglevel', 'error')
+            .run_async(cmd='ffmpeg', pipe_stdout=True, pipe_stderr=True)
+        )
+    except OSError as e:
+        print(f"Error starting ffmpeg: {e}")
+        return None, info
+    # Drained alongside stdout, so a decoder that logs a lot can't fill the pipe and stall
+    stderr = []
+    stderr_reader = threading.Thread(target=lambda: stderr.append(process.stderr.read()), daemon=True)
+    stderr_reader.start()
+    if mmap_path:
+        with open(mmap_path, "wb") as f:
+            shutil.copyfileobj(process.stdout, f, 1 << 20)
+    else:
+        # Read straight into a buffer sized from the probe; grows only if the probe was short
+        samples = np.empty(int((info["duration"] or 60) * sample_rate) + sample_rate, dtype=np.float32)
+        filled = 0
+        while True:
+            if filled == samples.nbytes:
+                samples = np.concatenate([samples, np.empty(len(samples) // 2 + sample_rate, dtype=np.float32)])
+            n = process.stdout.readinto(memoryview(samples).cast("B")[filled:])
+            if not n:
+                break
+            filled += n
+    stderr_reader.join()
+    if process.wait() != 0:
+        print(f"FFmpeg Error: {stderr[0].decode('utf8')}")
+        return None, info
+
+    if mmap_path:
+        if os.path.getsize(mmap_path) == 0:
+            return np.zeros(0, dtype=np.float32), info
+        return np.memmap(mmap_path, dtype=np.float32, mode="r"), info
+    return samples[:filled // 4], info
@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+import threading
+from .tts_cache import TTSCache
+
+
+def params_key(*parts):
+    """
+    Stable hash of JSON-serialisable stage parameters.
+    """
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf8")).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Persists the result of each pipeline stage so a rerun on the same input skips
+    the stages that already finished.
+
+    Stage results are JSON files under <root>/<media hash>/, named after the stage and
+    a hash of everything the result depends on, so changing a parameter (model size,
+    idiom list, language...) just misses. Rendered segment audio is content-addressed
+    under <root>/clips/, so editing one line only re-renders that line. Like the TTS
+    cache, clips are evicted least-recently-used once they pass max_clip_bytes.
+    """
+
+    def __init__(self, root="output/cache/checkpoints", max_clip_bytes=1024 * 1024 * 1024):
+        self.root = root
+        self.clips_dir = os.path.join(root, "clips")
+        # Same layout and LRU as synthesized speech: one .npy per key
+        self._clips = TTSCache(self.clips_dir, max_bytes=max_clip_bytes, memory_bytes=0)
+        self._index_path = os.path.join(root, "media_index.json")
+        self._lock = threading.Lock()
+
+    def media_key(self, path, chunk_size=4 * 1024 * 1024):
+        """
+        Content hash of the input file. Remembered per (path, size, mtime), so large
+        videos are only read once.
+        """
+        stat = os.stat(path)
+        signature = [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+        with self._lock:
+            index = self._read_json(self._index_path) or {}
+        cached = index.get(signature[0])
+        if cached and cached[:2] == signature[1:]:
+            return cached[2]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        key = digest.hexdigest()
+        with self._lock:
+            index = self._read_json(self._index_path) or {}
+            index[signature[0]] = signature[1:] + [key]
+            self._write_json(self._index_path, index)
+        return key
+
+    def _stage_path(self, media_key, stage, params):
+        return os.path.join(self.root, media_key, f"{stage}-{params_key(params)[:16]}.json")
+
+    def load(self, media_key, stage, params=None):
+        """
+        Returns the saved result of stage, or None if there is no valid checkpoint.
+        """
+        return self._read_json(self._stage_path(media_key, stage, params))
+
+    def save(self, media_key, stage, params, value):
+        path = self._stage_path(media_key, stage, params)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_json(path, value)
+
+    def load_clip(self, key):
+        return self._clips.get(key)
+
+    def save_clip(self, key, samples):
+        self._clips.put(key, samples)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, "r", encoding="utf8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Missing or half-written (e.g. killed mid-save): treat as not there
+            return None
+
+    @staticmethod
+    def _write_json(path, value):
+        # Write then rename, so a crash never leaves a truncated checkpoint behind
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(temp_path, path)
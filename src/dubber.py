@@ -1,58 +1,454 @@
 import os
-import shutil
 import asyncio
-from pydub import AudioSegment
-from .audio_utils import extract_audio_from_video, adjust_wav_speed, merge_audio_video, create_silent_wav, get_video_duration
-from .transcriber import Transcriber
+import multiprocessing
+from contextlib import contextmanager, ExitStack
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from .audio_utils import ingest_audio, time_stretch, merge_audio_video, AudioMuxer
+from .transcriber import Transcriber, ShardedTranscriber
 from .idiom_replacer import IdiomReplacer
-from .translator import TextTranslator
-from .tts import TTSGenerator
+from .translator import TextTranslator, GoogleHTTPBackend
+from .translation_cache import TranslationCache
+from .tts import HTTPTTSGenerator
+from .http_client import HTTPClient, AdaptiveLimiter, pooled_session
+from .tts_cache import TTSCache, CachedTTS
+from .timeline import Timeline, DUB_SAMPLE_RATE
+from .streaming import silence_windows
+from .synthesis import fit_clip
+from .checkpoints import CheckpointStore, params_key
+from .vad import speech_regions, compact, remap
+from .scheduler import plan_slots, MAX_TEMPO, MAX_LEAD_SEC
+from .mix import duck_envelope, mix_under, DUCK_DB
+from .subtitles import load_transcript, check_transcript
+from . import profiling
+from .speakers import speaker_embeddings, cluster_speakers, representative_spans, vote
 try:
-    from utils.utils import female_to_male, get_gender_from_audio
+    from utils.utils import classify_gender_batch
 except ImportError:
     # Fallback or handle if utils not found (e.g. if structure changes)
     import sys
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-    from utils.utils import female_to_male, get_gender_from_audio
+    from utils.utils import classify_gender_batch
+
+
+def output_paths(input_path, langs, output_path=None):
+    """
+    Output file per target language. Without output_path: <input>_dubbed_<lang><ext>.
+    With several languages, the language is appended to output_path's name.
+    """
+    if output_path and len(langs) == 1:
+        return {langs[0]: output_path}
+    base, ext = os.path.splitext(output_path or input_path)
+    suffix = "_{}" if output_path else "_dubbed_{}"
+    return {lang: f"{base}{suffix.format(lang)}{ext}" for lang in langs}
+
+
+def _report(progress, stage, fraction):
+    if progress:
+        progress(stage, fraction)
+
+
+def _print_subprocesses(before):
+    # Launches since the snapshot `before`; should not grow with the number of segments.
+    # Process-wide, so concurrent jobs (server mode) are counted together. Only counted
+    # while profiling (--profile), otherwise nothing is printed.
+    after = profiling.subprocess_counts()
+    started = {name: count - before.get(name, 0) for name, count in after.items() if count > before.get(name, 0)}
+    if started:
+        print("Subprocesses started: " + ", ".join(f"{name} x{count}" for name, count in sorted(started.items())))
 
 
 class DubbingEngine:
-    def __init__(self, output_dir="output"):
+    def __init__(self, output_dir="output", tts_concurrency=8, cpu_workers=None, speaker_clustering=True, f0_method="yin", window_sec=None, mmap_audio=False,
+                 acodec="aac", audio_bitrate=None, process_start_method=None, checkpoints=True, vad=True, max_tempo=MAX_TEMPO,
+                 transcribe_workers=None, quantize_whisper=False, mix=False, duck_db=DUCK_DB,
+                 transcriber=None, translation_backend=None, tts_generator=None, gender_classifier=None):
+        """
+        transcriber / translation_backend / tts_generator / gender_classifier: stand-ins for
+        Whisper, Google Translate, gTTS and classify_gender_batch, e.g. the offline fakes in
+        benchmarks/fakes.py. Translation and TTS caching still sit in front of them.
+        """
         self.output_dir = output_dir
+        # Stage results are saved per input so an interrupted or corrected run resumes
+        self.checkpoints = CheckpointStore(os.path.join(output_dir, "cache", "checkpoints")) if checkpoints else None
+        # Audio encoder for the final mux, e.g. "aac" or "libopus", and bitrate like "128k"
+        self.acodec = acodec
+        self.audio_bitrate = audio_bitrate
+        # Keep the decoded soundtrack in a memory-mapped file instead of RAM
+        self.mmap_audio = mmap_audio
+        # Only send detected speech (see src/vad.py) to Whisper
+        self.vad = vad
+        # Streaming mode for long videos: process the audio in windows of this many seconds
+        self.window_sec = window_sec
+        # Decide gender once per speaker cluster instead of once per segment
+        self.speaker_clustering = speaker_clustering
+        # Keep the original soundtrack (music, ambience) under the dub, turned down by
+        # duck_db where lines are spoken, instead of replacing it (see src/mix.py)
+        self.mix = mix
+        self.duck_db = duck_db
+        # Fastest a dubbed line may be sped up to fit, see src/scheduler.py
+        self.max_tempo = max_tempo
+        # Pitch tracker used for female->male conversion, see utils.pitch
+        self.f0_method = f0_method
+        # Max concurrent TTS requests, and pitch-shift/stretch worker processes (None = one per core)
+        self.tts_concurrency = tts_concurrency
+        self.cpu_workers = cpu_workers
+        # multiprocessing start method for the CPU pool; "forkserver" is safer when
+        # several jobs share this engine from different threads (see src/server.py)
+        self.process_start_method = process_start_method
         self.temp_dir = os.path.join(output_dir, "temp")
         os.makedirs(self.temp_dir, exist_ok=True)
         
-        self.transcriber = Transcriber()
+        # Whisper on several worker processes (and/or int8) for CPU-only hosts
+        if transcriber is None and (transcribe_workers or quantize_whisper):
+            transcriber = ShardedTranscriber(workers=transcribe_workers or 1, quantize=quantize_whisper)
+        self.transcriber = transcriber or Transcriber()
         self.idiom_replacer = IdiomReplacer()
-        self.translator = TextTranslator()
-        self.tts = TTSGenerator()
+        # Translation and TTS share one keep-alive session; each backs off on its own
+        session = pooled_session(max(tts_concurrency, 4))
+        self.translator = TextTranslator(
+            backend=translation_backend or GoogleHTTPBackend(HTTPClient(session)),
+            cache=TranslationCache(os.path.join(output_dir, "cache", "translations.sqlite"))
+        )
+        tts_limiter = AdaptiveLimiter(initial=min(4, tts_concurrency), maximum=tts_concurrency)
+        self.tts = CachedTTS(
+            tts_generator or HTTPTTSGenerator(client=HTTPClient(session, tts_limiter)),
+            TTSCache(os.path.join(output_dir, "cache", "tts")),
+        )
+        self.classify_genders = gender_classifier or classify_gender_batch
 
-    async def process_video(self, video_path, target_lang, output_video_path):
+    async def process_video(self, video_path, target_lang, output_video_path, work_dir=None, progress=None, transcript=None):
+        """
+        work_dir: scratch directory for this run (default output/temp). Give concurrent
+        runs on the same engine their own.
+        progress: optional callback(stage, fraction) with fraction going from 0 to 1.
+        transcript: subtitles to use instead of Whisper, see process_languages.
+        """
+        results = await self.process_languages(video_path, {target_lang: output_video_path}, work_dir, progress, transcript)
+        return results[target_lang]
+
+    async def process_languages(self, video_path, outputs, work_dir=None, progress=None, transcript=None):
+        """
+        Dubs video_path into several languages in one run. outputs: {lang: output path}.
+        Audio extraction, transcription, idiom replacement and gender detection run once
+        and are shared; translation, TTS and the mux run concurrently per language.
+        transcript: an .srt/.vtt/Whisper .json path (or its segments) to use instead of
+        transcribing; Whisper is then never loaded.
+        Returns {lang: True/False}.
+        """
+        temp_dir = work_dir or self.temp_dir
+        os.makedirs(temp_dir, exist_ok=True)
+        if self.window_sec:
+            return await self._process_streaming(video_path, outputs, temp_dir, progress, transcript)
+
+        failed = {lang: False for lang in outputs}
+        spawned = profiling.subprocess_counts()
         print(f"Processing video: {video_path}")
+        media_key = self.checkpoints.media_key(video_path) if self.checkpoints else None
         
         # 1. Extract Audio
-        original_audio_path = os.path.join(self.temp_dir, "original.wav")
-        if not extract_audio_from_video(video_path, original_audio_path):
+        # Decoded once to 16 kHz mono float32; Whisper and gender detection share this array
+        _report(progress, "extract", 0.0)
+        mmap_path = os.path.join(temp_dir, "original.f32") if self.mmap_audio else None
+        with profiling.span("extract"):
+            original_speech, media = ingest_audio(video_path, 16000, mmap_path)
+        if original_speech is None:
             print("Failed to extract audio.")
-            return False
-            
-        # Load original audio for segment extraction
-        original_audio_full = AudioSegment.from_file(original_audio_path)
+            return failed
+        background = None
+        if self.mix:
+            # At the dub's rate, so the music keeps its highs
+            with profiling.span("extract", track="background"):
+                background_path = os.path.join(temp_dir, "background.f32") if self.mmap_audio else None
+                background, _ = ingest_audio(video_path, DUB_SAMPLE_RATE, background_path)
 
-        # 2. Transcribe
-        segments = self.transcriber.transcribe(original_audio_path)
+        # 2. Transcribe, unless we were given the subtitles
+        _report(progress, "transcribe", 0.05)
+        if transcript is not None:
+            segments = self._imported_transcript(transcript, media["duration"])
+            if segments is None:
+                return failed
+        else:
+            with profiling.span("transcribe"):
+                segments = self._transcribe(original_speech, media_key)
         if not segments:
             print("No speech detected.")
-            return False
+            return failed
             
         print(f"Detected {len(segments)} segments.")
 
-        # 3. Process Segments (Idiom Replacement + Translation)
-        processed_segments = []
+        # 3. Process Segments (Idiom Replacement, then Translation per language)
+        _report(progress, "translate", 0.3)
+        with profiling.span("idioms"):
+            prepared_segments = self._prepare_segments(segments, media_key)
+        video_duration_sec = media["duration"]
+
+        # 4. Generate TTS and Adjust Speed, then 5. Merge, for every language at once
+        total = len(prepared_segments) * len(outputs)
+        finished = 0
+        def on_done():
+            nonlocal finished
+            finished += 1
+            _report(progress, "synthesize", 0.4 + 0.55 * finished / total)
+
+        _report(progress, "synthesize", 0.4)
+        # Lines fixed with correct_translation() are looked up by the transcript they were numbered in
+        transcript_key = params_key(segments)
+        with self._pools() as pools:
+            genders = self._start_gender_detection(original_speech, prepared_segments, pools, media_key)
+            results = await asyncio.gather(*[
+                self._dub_language(video_path, prepared_segments, lang, output_path, genders, video_duration_sec, pools, on_done,
+                                   media_key, background, transcript_key)
+                for lang, output_path in outputs.items()
+            ])
+
+        stats = self.tts.stats()
+        print(f"TTS cache hit rate {stats['hit_rate']:.0%}, saved ~{stats['saved_seconds']:.1f}s of synthesis")
+        
+        _print_subprocesses(spawned)
+        
+        # Cleanup
+        # shutil.rmtree(temp_dir) # Keep for debugging if needed, or delete.
+        _report(progress, "done", 1.0)
+        print("Done.")
+        return dict(zip(outputs, results))
+
+    async def _dub_language(self, video_path, prepared_segments, target_lang, output_video_path, genders,
+                            video_duration_sec, pools, on_done=None, media_key=None, background=None, transcript_key=None):
+        """
+        Translation, TTS, assembly and mux of one target language.
+        transcript_key: params_key() of the transcript, to apply corrections made for it.
+        """
+        with profiling.span("translate", lang=target_lang):
+            processed_segments = await self._translate_segments(prepared_segments, target_lang, media_key, transcript_key)
+
+        # The dub is written into one preallocated buffer at each segment's offset.
+        # Size it from the video so the final pad/trim is done in place.
+        last_end_sec = max(seg['end'] for seg in processed_segments)
+        timeline = Timeline(max(video_duration_sec or 0, last_end_sec))
+        with profiling.span("synthesize", lang=target_lang):
+            clips = await self._render_segments(processed_segments, target_lang, genders, timeline.sample_rate, pools, on_done)
+        with profiling.span("assemble", lang=target_lang):
+            placed = await self._lay_out(timeline, processed_segments, clips, video_duration_sec, pools, target_lang)
+
+        print(f"Merging into {output_video_path}...")
         
-        # Prepare batch translation if possible, but for now let's do it sequentially or gather
-        # to ensure we keep track of segment indices.
+        # The plan keeps the dub inside the video, so this only pads the tail with silence
+        if video_duration_sec:
+            print(f"[{target_lang}] Video Duration: {video_duration_sec}s, Audio Duration: {timeline.duration}s")
+            timeline.fit(video_duration_sec)
+        if background is not None:
+            with profiling.span("mix", lang=target_lang):
+                self._mix(timeline, background, processed_segments, placed)
         
+        # The finished track is piped straight into the mux, nothing goes to disk
+        io_pool = pools[0]
+        with profiling.span("mux", lang=target_lang):
+            return await asyncio.get_running_loop().run_in_executor(
+                io_pool, merge_audio_video, video_path, timeline.samples(), output_video_path,
+                timeline.sample_rate, self.acodec, self.audio_bitrate,
+            )
+
+    async def _process_streaming(self, video_path, outputs, temp_dir, progress=None, transcript=None):
+        """
+        Bounded-memory variant of process_languages for long inputs.
+        The soundtrack is handled in windows of about window_sec cut at pauses; each
+        window is transcribed, translated, dubbed and piped into the running muxes before
+        the next one is read, so memory depends on the window size, not the video length.
+        """
+        print(f"Processing video (streaming, {self.window_sec:.0f}s windows): {video_path}")
+        spawned = profiling.subprocess_counts()
+
+        # Always memory-mapped here, windows are read from it one at a time
+        _report(progress, "extract", 0.0)
+        with profiling.span("extract"):
+            original_speech, media = ingest_audio(video_path, 16000, os.path.join(temp_dir, "original.f32"))
+            background = None
+            if original_speech is not None and self.mix:
+                background, _ = ingest_audio(video_path, DUB_SAMPLE_RATE, os.path.join(temp_dir, "background.f32"))
+        if original_speech is None:
+            print("Failed to extract audio.")
+            return {lang: False for lang in outputs}
+
+        video_duration_sec = media["duration"]
+        media_key = self.checkpoints.media_key(video_path) if self.checkpoints else None
+        total_segments = 0
+        if transcript is not None:
+            transcript = self._imported_transcript(transcript, video_duration_sec)
+            if transcript is None:
+                return {lang: False for lang in outputs}
+
+        # Pools are shut down before the muxers close: forked workers inherit ffmpeg's
+        # stdin, and ffmpeg only sees the end of the audio once they are all gone.
+        with ExitStack() as stack:
+            muxers = {
+                lang: stack.enter_context(AudioMuxer(video_path, path, DUB_SAMPLE_RATE, self.acodec, self.audio_bitrate))
+                for lang, path in outputs.items()
+            }
+            pools = stack.enter_context(self._pools())
+            for window_start_sec, speech in silence_windows(original_speech, self.window_sec):
+                if video_duration_sec and window_start_sec >= video_duration_sec:
+                    break
+                window_sec = len(speech) / 16000
+                window_end_sec = window_start_sec + window_sec
+                is_last = video_duration_sec and window_end_sec >= video_duration_sec - 1e-3
+                if video_duration_sec:
+                    _report(progress, "window", min(window_start_sec / video_duration_sec, 1.0))
+
+                # Each window keeps its length so the dub stays in sync with the video;
+                # the last one is padded or trimmed to the video's end.
+                fit_sec = video_duration_sec - window_start_sec if is_last else window_sec
+
+                # Whisper takes the 16 kHz float array directly; timestamps are window-relative
+                # Checkpoints are scoped to the window (same cut points on a rerun with the same window_sec)
+                scope = [window_start_sec, len(speech)]
+                if transcript is not None:
+                    # Cues belong to the window they start in, timed relative to it
+                    segments = [
+                        dict(seg, start=seg['start'] - window_start_sec, end=min(seg['end'], window_end_sec) - window_start_sec)
+                        for seg in transcript if window_start_sec <= seg['start'] < window_end_sec
+                    ]
+                else:
+                    with profiling.span("transcribe", window=window_start_sec):
+                        segments = self._transcribe(speech, media_key, scope)
+                prepared_segments = self._prepare_segments(segments, media_key, scope) if segments else []
+                if segments:
+                    print(f"[{window_start_sec:.0f}s-{window_end_sec:.0f}s] Detected {len(segments)} segments.")
+                    total_segments += len(segments)
+                genders = self._start_gender_detection(speech, prepared_segments, pools, media_key, scope) if segments else None
+
+                async def dub_window(lang):
+                    timeline = Timeline(window_sec)
+                    processed_segments, placed = [], []
+                    if prepared_segments:
+                        with profiling.span("translate", lang=lang, window=window_start_sec):
+                            processed_segments = await self._translate_segments(prepared_segments, lang, media_key)
+                        with profiling.span("synthesize", lang=lang, window=window_start_sec):
+                            clips = await self._render_segments(processed_segments, lang, genders, timeline.sample_rate, pools)
+                        # Clips may spill into silence but not past the window, so windows stay in sync
+                        placed = await self._lay_out(timeline, processed_segments, clips, fit_sec, pools, lang)
+                    timeline.fit(fit_sec)
+                    if background is not None:
+                        # Windows with no speech still carry the soundtrack
+                        offset = timeline.to_samples(window_start_sec)
+                        self._mix(timeline, background[offset:offset + timeline.end], processed_segments, placed)
+                    muxers[lang].write(timeline.samples())
+
+                await asyncio.gather(*[dub_window(lang) for lang in outputs])
+
+            for muxer in muxers.values():
+                # Audio stream ended before the video did
+                if video_duration_sec and muxer.duration < video_duration_sec:
+                    muxer.write(np.zeros(round((video_duration_sec - muxer.duration) * DUB_SAMPLE_RATE), dtype=np.int16))
+
+            if not total_segments:
+                print("No speech detected.")
+                for muxer in muxers.values():
+                    muxer.abort()
+                return {lang: False for lang in outputs}
+            print(f"Finishing {', '.join(outputs.values())}...")
+
+        stats = self.tts.stats()
+        print(f"TTS cache hit rate {stats['hit_rate']:.0%}, saved ~{stats['saved_seconds']:.1f}s of synthesis")
+        _print_subprocesses(spawned)
+        _report(progress, "done", 1.0)
+        print("Done.")
+        return {lang: muxer.ok for lang, muxer in muxers.items()}
+
+    def _load_checkpoint(self, media_key, stage, params):
+        if media_key is None:
+            return None
+        value = self.checkpoints.load(media_key, stage, params)
+        if value is not None:
+            print(f"Reusing {stage} checkpoint.")
+        return value
+
+    def _save_checkpoint(self, media_key, stage, params, value):
+        if media_key is not None:
+            self.checkpoints.save(media_key, stage, params, value)
+
+    def _transcript_params(self, scope=None):
+        return {"model": getattr(self.transcriber, "model_size", None), "scope": scope, "vad": self.vad}
+
+    def _transcribe(self, speech, media_key=None, scope=None):
+        params = self._transcript_params(scope)
+        segments = self._load_checkpoint(media_key, "transcript", params)
+        if segments is None:
+            regions = None
+            if self.vad:
+                with profiling.span("vad"):
+                    regions = speech_regions(speech)
+                kept = sum(end - start for start, end in regions)
+                print(f"Speech detected in {kept / 16000:.0f}s of {len(speech) / 16000:.0f}s of audio.")
+                # Not worth a copy when there's next to nothing to skip
+                if kept > 0.95 * len(speech):
+                    regions = None
+            if regions == []:
+                segments = []
+            else:
+                audio = compact(speech, regions) if regions else speech
+                # Only the fields the pipeline uses are kept
+                segments = [
+                    {"start": seg["start"], "end": seg["end"], "text": seg["text"]}
+                    for seg in self.transcriber.transcribe(audio)
+                ]
+                if regions:
+                    segments = remap(segments, regions)
+            if segments:
+                self._save_checkpoint(media_key, "transcript", params, segments)
+        return segments
+
+    def _imported_transcript(self, transcript, duration_sec):
+        """
+        Loads and checks a transcript given instead of Whisper. Returns the segments,
+        or None (after saying why) if it can't be used for this video.
+        """
+        try:
+            segments = load_transcript(transcript) if isinstance(transcript, str) else transcript
+            segments = check_transcript(segments, duration_sec)
+        except (OSError, ValueError) as e:
+            print(f"Transcript rejected: {e}")
+            return None
+        print(f"Using {len(segments)} segments from the transcript, skipping Whisper.")
+        return segments
+
+    def correct_translation(self, video_path, target_lang, index, text, transcript=None):
+        """
+        Replaces the translation of segment index (0-based, in transcript order) for
+        video_path. The next run re-renders only that segment; everything else comes
+        from checkpoints.
+        The index refers to transcript (as for process_languages) if given, else to the
+        Whisper transcript of an earlier run with the same settings; the correction only
+        applies while the transcript stays the same. Not supported in streaming mode,
+        where segments are numbered per window.
+        Raises ValueError if there's no such transcript or segment.
+        """
+        if self.window_sec:
+            raise ValueError("corrections can't be used in streaming mode")
+        media_key = self.checkpoints.media_key(video_path)
+        if transcript is not None:
+            segments = check_transcript(load_transcript(transcript) if isinstance(transcript, str) else transcript)
+        else:
+            segments = self.checkpoints.load(media_key, "transcript", self._transcript_params())
+        if not segments:
+            raise ValueError("no transcript for this video yet, dub it once before correcting lines")
+        if not 0 <= index < len(segments):
+            raise ValueError(f"segment {index} doesn't exist, the transcript has segments 0 to {len(segments) - 1}")
+        params = {"lang": target_lang, "transcript": params_key(segments)}
+        corrections = self.checkpoints.load(media_key, "corrections", params) or {}
+        corrections[str(index)] = text
+        self.checkpoints.save(media_key, "corrections", params, corrections)
+
+    def _prepare_segments(self, segments, media_key=None, scope=None):
+        """
+        Language-independent part of segment processing: timing and idiom replacement.
+        """
+        params = {"transcript": params_key(segments), "idioms": self.idiom_replacer.signature, "scope": scope}
+        cached = self._load_checkpoint(media_key, "literal", params)
+        if cached is not None:
+            return cached
+
+        processed_segments = []
         for i, seg in enumerate(segments):
             original_text = seg["text"]
             start_time = seg["start"]
@@ -62,9 +458,6 @@ class DubbingEngine:
             # a. Idiom Replacement
             literal_text = self.idiom_replacer.replace(original_text)
             
-            # b. Translation
-            # Note: We are calling async method synchronously here for simplicity in this loop, 
-            # or we can gather them. Let's gather them for efficiency.
             processed_segments.append({
                 "index": i,
                 "start": start_time,
@@ -72,158 +465,227 @@ class DubbingEngine:
                 "duration": duration,
                 "original_text": original_text,
                 "literal_text": literal_text,
-                "translated_text": "" # To be filled
+                "translated_text": "" # Filled per language by _translate_segments
             })
+        self._save_checkpoint(media_key, "literal", params, processed_segments)
+        return processed_segments
 
-        # Batch translate
-        texts_to_translate = [s["literal_text"] for s in processed_segments]
-        translated_texts = await self.translator.translate_batch(texts_to_translate, dest_lang=target_lang)
-        
-        for i, text in enumerate(translated_texts):
-            processed_segments[i]["translated_text"] = text
+    async def _translate_segments(self, prepared_segments, target_lang, media_key=None, transcript_key=None):
+        """
+        Batch translation of prepared segments. Returns copies with translated_text set.
+        transcript_key: params_key() of the transcript the segments came from; lines fixed
+        for it with correct_translation() are applied.
+        """
+        texts_to_translate = [s["literal_text"] for s in prepared_segments]
+        params = {"lang": target_lang, "texts": params_key(texts_to_translate)}
+        translated_texts = self._load_checkpoint(media_key, "translations", params)
+        if translated_texts is None:
+            translated_texts = await self.translator.translate_batch(texts_to_translate, dest_lang=target_lang)
+            failed = sum(text is None for text in translated_texts)
+            if failed:
+                # Dubbed as they are this time, and retried on the next run
+                print(f"[{target_lang}] {failed} line(s) failed to translate and keep the source text; not checkpointed.")
+                translated_texts = [source if text is None else text for source, text in zip(texts_to_translate, translated_texts)]
+            else:
+                self._save_checkpoint(media_key, "translations", params, translated_texts)
+        if transcript_key and media_key is not None:
+            fixed = self.checkpoints.load(media_key, "corrections", {"lang": target_lang, "transcript": transcript_key}) or {}
+            translated_texts = list(translated_texts)
+            for index, text in fixed.items():
+                translated_texts[int(index)] = text
+        processed_segments = [dict(seg, translated_text=text) for seg, text in zip(prepared_segments, translated_texts)]
 
-        # 4. Generate TTS and Adjust Speed
-        final_audio = AudioSegment.silent(duration=0)
-        current_time_ms = 0
-        
-        # We need to construct the timeline.
-        # Gaps between segments should be filled with silence (or original background noise if we split tracks,
-        # but for now let's just silence/duck).
-        
-        # Actually, a better approach is to create a base silent track of the total duration 
-        # (we need total duration of video) and overlay segments.
-        # But we don't know total duration easily unless we probe video.
-        # Let's just build it chronologically.
+        stats = self.translator.stats()
+        if "hit_rate" in stats:
+            print(f"Translation: {stats['requests']} requests, cache hit rate {stats['hit_rate']:.0%}")
+        return processed_segments
 
-        # First segment starts at processed_segments[0]['start']
-        # We need to handle the gap before the first segment.
-        
-        for i, seg in enumerate(processed_segments):
-            start_ms = int(seg['start'] * 1000)
-            target_duration_ms = int(seg['duration'] * 1000)
-            
-            # Gap handling
-            if start_ms > current_time_ms:
-                silence_duration = start_ms - current_time_ms
-                final_audio += AudioSegment.silent(duration=silence_duration)
-                current_time_ms += silence_duration
-            
-            # Generate TTS
-            tts_filename = os.path.join(self.temp_dir, f"seg_{i}.mp3") # gTTS saves as mp3 usually, but our wrapper is flexible.
-            # Our TTS wrapper saves to path.
-            
-            # Translation might return empty if silent?
-            text = seg['translated_text']
-            if not text.strip():
-                # If translation is empty, just add silence for the duration
-                final_audio += AudioSegment.silent(duration=target_duration_ms)
-                current_time_ms += target_duration_ms
-                continue
-
-            if self.tts.generate_audio(text, target_lang, tts_filename):
-                # Now we have the TTS file. We need to check its duration.
-                tts_audio = AudioSegment.from_file(tts_filename)
-                tts_duration_ms = len(tts_audio)
-                
-                # Speed adjustment
-                # We want the TTS to fit into target_duration_ms.
-                # However, if it's too fast, it sounds bad. 
-                # If TTS is shorter than target, we can pad with silence.
-                # If TTS is longer, we must speed it up.
-                
-                # Let's use our audio_utils adjust_wav_speed (which uses wave/audioop) 
-                # So we need to convert to wav first if it is mp3.
-                tts_wav_path = os.path.join(self.temp_dir, f"seg_{i}.wav")
-                tts_audio.export(tts_wav_path, format="wav")
-                
-                # Gender Check & Voice Conversion
-                # Extract original segment audio to check gender
-                # seg['start'] is in seconds
-                orig_start_ms = int(seg['start'] * 1000)
-                orig_end_ms = int(seg['end'] * 1000)
-                
-                # Ensure bounds
-                if orig_end_ms > len(original_audio_full):
-                    orig_end_ms = len(original_audio_full)
-                    
-                if orig_start_ms < orig_end_ms:
-                    seg_audio_chunk = original_audio_full[orig_start_ms:orig_end_ms]
-                    seg_chunk_path = os.path.join(self.temp_dir, f"seg_orig_{i}.wav")
-                    seg_audio_chunk.export(seg_chunk_path, format="wav")
-                    
-                    try:
-                        detected_gender = get_gender_from_audio(seg_chunk_path)                        
-                        if detected_gender == 'male':
-
-                            female_to_male(tts_wav_path, tts_wav_path)
-                            tts_audio = AudioSegment.from_wav(tts_wav_path)
-                            tts_duration_ms = len(tts_audio) # Update duration if it changed (usually similar)
-                    except Exception as e:
-                        print(f"Gender detection/conversion failed for segment {i}: {e}")
-
-                # Adjust speed
-                # Check ratio
-                ratio = tts_duration_ms / target_duration_ms
-                
-                if ratio > 1.0: 
-                    # TTS is longer, needs to speed up
-                    # Pass target duration in seconds
-                    adjust_wav_speed(tts_wav_path, seg['duration'], overwrite_path=tts_wav_path)
-                    # Reload adjusted
-                    adjusted_seg = AudioSegment.from_wav(tts_wav_path)
-                else:
-                    # TTS is shorter, we kept it as is, but we will center it or just append silence?
-                    # Let's just use the original TTS and pad the remaining time after adding it to timeline
-                    adjusted_seg = AudioSegment.from_wav(tts_wav_path)
-                
-                # Now append to final_audio
-                final_audio += adjusted_seg
-                current_time_ms += len(adjusted_seg)
-                
-                # If we sped it up, it should adhere to target_duration.
-                # If we didn't (because it was shorter), we need to fill the rest of the slot.
-                remaining_ms = target_duration_ms - len(adjusted_seg)
-                if remaining_ms > 0:
-                    final_audio += AudioSegment.silent(duration=remaining_ms)
-                    current_time_ms += remaining_ms
-                    
-            else:
-                 # TTS failed? Silent.
-                final_audio += AudioSegment.silent(duration=target_duration_ms)
-                current_time_ms += target_duration_ms
-        
-        # 5. Merge
-        print(f"Merging into {output_video_path}...")
-        
-        # Check total duration and adjust if necessary
-        video_duration_sec = get_video_duration(video_path)
-        if video_duration_sec:
-            final_audio_duration_ms = len(final_audio)
-            video_duration_ms = video_duration_sec * 1000
-            
-            print(f"Video Duration: {video_duration_sec}s, Audio Duration: {final_audio_duration_ms/1000}s")
-            
-            # Tolerance of 100ms? 
-            if final_audio_duration_ms > video_duration_ms:
-                print("Audio is longer than video. Squeezing...")
-                # Export temp for adjustment
-                temp_dub_path = os.path.join(self.temp_dir, "temp_dub.wav")
-                final_audio.export(temp_dub_path, format="wav")
-                
-                adjust_wav_speed(temp_dub_path, video_duration_sec, overwrite_path=temp_dub_path)
-                final_audio = AudioSegment.from_wav(temp_dub_path)
-            elif final_audio_duration_ms < video_duration_ms:
-                print("Audio is shorter than video. Padding with silence...")
-                silence_duration = video_duration_ms - final_audio_duration_ms
-                final_audio += AudioSegment.silent(duration=silence_duration)
-        
-        # Export full audio
-        dubbed_audio_path = os.path.join(self.temp_dir, "dubbed.wav")
-        final_audio.export(dubbed_audio_path, format="wav")
+    @contextmanager
+    def _pools(self):
+        """
+        Network TTS runs on a bounded I/O pool, pitch shifting / stretching on a process
+        pool, and gender detection on a single thread of its own.
+        """
+        mp_context = multiprocessing.get_context(self.process_start_method) if self.process_start_method else None
+        with ThreadPoolExecutor(max_workers=self.tts_concurrency) as io_pool, \
+                ThreadPoolExecutor(max_workers=1) as gender_pool, \
+                ProcessPoolExecutor(max_workers=self.cpu_workers, mp_context=mp_context) as cpu_pool:
+            # Workers are started before any mux: forked later, they would inherit ffmpeg's
+            # stdin and it would never see the end of the audio (a fork pool starts them all
+            # on the first submit; other start methods don't inherit the pipe)
+            cpu_pool.submit(int).result()
+            yield io_pool, gender_pool, cpu_pool
 
-        merge_audio_video(video_path, dubbed_audio_path, output_video_path)
-        
-        # Cleanup
-        # shutil.rmtree(self.temp_dir) # Keep for debugging if needed, or delete.
-        print("Done.")
-        return True
+    def _start_gender_detection(self, speech, prepared_segments, pools, media_key=None, scope=None):
+        """
+        Runs gender detection for all segments as one batched job on its own thread
+        (the model is already multi-threaded). Returns a future of one result per segment,
+        shared by every language.
+        """
+        _, gender_pool, _ = pools
+        loop = asyncio.get_running_loop()
+        spans = [(seg['start'], seg['end']) for seg in prepared_segments]
+        params = {"spans": params_key(spans), "clustering": self.speaker_clustering, "scope": scope}
+        cached = self._load_checkpoint(media_key, "genders", params)
+        if cached is not None:
+            genders = loop.create_future()
+            genders.set_result([tuple(result) for result in cached])
+            return genders
+
+        def detect():
+            with profiling.span("genders", segments=len(spans)):
+                results = self._detect_genders(speech, spans)
+            # A failed detection isn't worth keeping
+            if any(label for label, _ in results):
+                self._save_checkpoint(media_key, "genders", params, results)
+            return results
+        return loop.run_in_executor(gender_pool, detect)
+
+    async def _render_segments(self, processed_segments, target_lang, genders, sample_rate, pools, on_done=None):
+        """
+        Renders all segments concurrently; gather() keeps segment order.
+        genders: future from _start_gender_detection, overlapping with the TTS requests.
+        on_done: optional callback() after each finished segment.
+        """
+        io_pool, _, cpu_pool = pools
+
+        async def render(seg):
+            clip = await self._render_segment(seg, target_lang, genders, sample_rate, (io_pool, cpu_pool))
+            if on_done:
+                on_done()
+            return clip
+
+        return await asyncio.gather(*[render(seg) for seg in processed_segments])
+
+    async def _lay_out(self, timeline, processed_segments, clips, end_sec, pools, target_lang=""):
+        """
+        Plans every clip's position and tempo at once (see plan_slots), speeds up the
+        clips that need it on the CPU pool and writes them into the timeline.
+        end_sec: the dub must end by then (None: no limit).
+        Returns the (start, end) seconds of every placed clip.
+        """
+        _, _, cpu_pool = pools
+        loop = asyncio.get_running_loop()
+        lengths = [0 if clip is None else len(clip) for clip in clips]
+        starts = [timeline.to_samples(seg['start']) for seg in processed_segments]
+        end = timeline.to_samples(end_sec) if end_sec else None
+        # The last line may run on to the end of the track
+        last = end if end is not None else starts[-1] + lengths[-1]
+        placed, planned, kept = plan_slots(
+            starts, starts[1:] + [max(last, starts[-1])], lengths, end,
+            self.max_tempo, timeline.to_samples(MAX_LEAD_SEC),
+        )
+
+        async def fit(clip, length, keep):
+            if clip is None or keep <= 0:
+                return None
+            if length < len(clip):
+                with profiling.span("segment.stretch", lang=target_lang) as span:
+                    clip, cpu = await loop.run_in_executor(
+                        cpu_pool, profiling.timed_call, time_stretch, clip, length, timeline.sample_rate
+                    )
+                    profiling.add_worker_cpu(span, cpu)
+            # Only lines that don't fit even at max_tempo lose their tail
+            return clip[:keep]
+
+        fitted = await asyncio.gather(*[fit(clip, length, keep) for clip, length, keep in zip(clips, planned, kept)])
+        for clip, start in zip(fitted, placed):
+            if clip is not None:
+                timeline.place(clip, start / timeline.sample_rate)
+
+        sped_up = [length / planned_length for length, planned_length in zip(lengths, planned) if length > planned_length > 0]
+        late = max([(p - s) / timeline.sample_rate for p, s, length in zip(placed, starts, lengths) if length] or [0.0])
+        if sped_up:
+            print(f"[{target_lang}] Sped up {len(sped_up)} of {len(clips)} lines (up to x{max(sped_up):.2f}), "
+                  f"latest start {late:.2f}s behind its line.")
+        cut = sum(1 for length, keep in zip(planned, kept) if keep < length)
+        if cut:
+            print(f"[{target_lang}] {cut} line(s) didn't fit before the end even at x{self.max_tempo:.2f} and were cut short.")
+        sr = timeline.sample_rate
+        return [(start / sr, (start + keep) / sr) for start, keep in zip(placed, kept) if keep > 0]
+
+    def _mix(self, timeline, background, processed_segments, placed):
+        """
+        Mixes background (the original soundtrack at the timeline's rate, float) under
+        the dub, ducked wherever a line was spoken in the original or is spoken in the dub.
+        placed: (start, end) seconds of the dubbed clips, from _lay_out.
+        """
+        spans = [(seg['start'], seg['end']) for seg in processed_segments] + placed
+        envelope = duck_envelope(spans, timeline.duration, self.duck_db)
+        mix_under(timeline.samples(), background, envelope, timeline.sample_rate)
+
+    async def _render_segment(self, seg, target_lang, genders, sample_rate, pools):
+        """
+        Synthesizes one segment, converting the voice if needed.
+        genders: future resolving to one (label, confidence) per segment.
+        Returns a mono int16 array, or None if the segment should stay silent.
+        """
+        io_pool, cpu_pool = pools
+        loop = asyncio.get_running_loop()
+        i = seg['index']
+
+        # Translation might return empty if silent?
+        text = seg['translated_text']
+        if not text.strip():
+            return None
+
+        # Clips are saved before scheduling, so their key doesn't depend on the slot
+        clip_key = lambda to_male: params_key(
+            text, target_lang, sample_rate, to_male, self.f0_method, getattr(self.tts, "voice_settings", None)
+        )
+        # On a rerun genders come from a checkpoint, so the finished clip can be looked up
+        # before any TTS work; only new or corrected lines get past this
+        if self.checkpoints is not None and genders.done():
+            rendered = self.checkpoints.load_clip(clip_key(genders.result()[i][0] == 'male'))
+            if rendered is not None:
+                return rendered
+
+        # Generate TTS (answered from the PCM cache for lines we've synthesized before)
+        with profiling.span("segment.tts", lang=target_lang, index=i):
+            clip = await loop.run_in_executor(io_pool, self.tts.synthesize, text, target_lang, sample_rate)
+        if clip is None:
+            # TTS failed? Silent.
+            return None
+
+        # Gender Check (shared batched result)
+        detected_gender, _ = (await genders)[i]
+        to_male = detected_gender == 'male'
+
+        # Voice conversion is CPU bound; the speed is settled later by _lay_out
+        with profiling.span("segment.fit", lang=target_lang, index=i, to_male=to_male) as span:
+            # CPU time is measured in the worker, the parent only sees the wait
+            clip, cpu = await loop.run_in_executor(
+                cpu_pool, profiling.timed_call, fit_clip, clip, sample_rate, None, to_male, self.f0_method
+            )
+            profiling.add_worker_cpu(span, cpu)
+        if self.checkpoints is not None:
+            self.checkpoints.save_clip(clip_key(to_male), clip)
+        return clip
+
+    def _detect_genders(self, speech, spans):
+        """
+        Returns one (label, confidence) per span.
+        With speaker clustering, segments are grouped by voice first and the classifier
+        only runs on the longest spans of each group; the group's vote is shared by all
+        of its segments, so one speaker doesn't flip voices on a misclassified short line.
+        """
+        try:
+            labels = None
+            if self.speaker_clustering:
+                try:
+                    labels = cluster_speakers(speaker_embeddings(speech, spans))
+                except Exception as e:
+                    # e.g. silent or constant audio: NaN distances that linkage rejects
+                    print(f"Speaker clustering failed ({e}), classifying every segment.")
+            if labels is None:
+                return self.classify_genders(speech, spans)
+
+            picks = representative_spans(spans, labels)
+            representatives = [i for members in picks.values() for i in members]
+            results = dict(zip(representatives, self.classify_genders(speech, [spans[i] for i in representatives])))
+            cluster_genders = {cluster: vote([results[i] for i in members]) for cluster, members in picks.items()}
+            print(f"Found {len(picks)} speaker(s), classified {len(representatives)} of {len(spans)} segments.")
+            return [cluster_genders[int(cluster)] for cluster in labels]
+        except Exception as e:
+            print(f"Gender detection failed: {e}")
+            return [(None, 0.0)] * len(spans)
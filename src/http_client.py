@@ -0,0 +1,125 @@
+import time
+import random
+import threading
+import requests
+from . import profiling
+
+# Statuses that mean "slow down" rather than "this request is wrong"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AdaptiveLimiter:
+    """
+    Caps requests in flight and adapts the cap to the server (AIMD): every success
+    raises it by 1/limit (about +1 per round of requests), every throttle (429/5xx)
+    halves it. Thread-safe, since requests run on executor threads.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=32, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def succeeded(self):
+        with self._cond:
+            grew = int(self.limit + 1.0 / self.limit) > int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            if grew:
+                self._cond.notify_all()
+
+    def throttled(self):
+        with self._cond:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+
+
+def pooled_session(pool_size=32):
+    """
+    requests.Session keeping up to pool_size connections per host alive.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HTTPClient:
+    """
+    One keep-alive requests.Session (so short lines don't each pay a TLS handshake)
+    behind an AdaptiveLimiter, with timeouts and jittered exponential backoff.
+    Give each remote service its own client, they can share the session.
+    """
+
+    def __init__(self, session=None, limiter=None, timeout=(5, 30), retries=4, backoff=0.5, max_backoff=10.0):
+        self.session = session or pooled_session()
+        self.limiter = limiter or AdaptiveLimiter()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.requests = 0
+        self.throttles = 0
+        self._lock = threading.Lock()
+
+    def _delay(self, attempt, response=None):
+        # Honour Retry-After when the server sends seconds, else full jitter
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request, retrying throttles, server errors and connection failures.
+        Returns the response; raises requests.HTTPError / RequestException once out of retries.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            response = None
+            self.limiter.acquire()
+            try:
+                with self._lock:
+                    self.requests += 1
+                profiling.count("http.requests")
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            finally:
+                self.limiter.release()
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                self.limiter.succeeded()
+                response.raise_for_status()
+                return response
+
+            self.limiter.throttled()
+            with self._lock:
+                self.throttles += 1
+            profiling.count("http.throttled")
+            if attempt == self.retries:
+                response.raise_for_status()
+            time.sleep(self._delay(attempt, response))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self):
+        return {"requests": self.requests, "throttled": self.throttles, "concurrency": int(self.limiter.limit)}
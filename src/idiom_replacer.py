@@ -1,31 +1,167 @@
 import json
-import re
 import os
+import pickle
+
+INDEX_VERSION = 1
+
+# Key marking the end of an idiom in the trie; never collides with a single character
+_END = ""
+
+def _build_trie(idioms):
+    """
+    Radix trie of the (lowercased) idioms. Each node maps the first character of an
+    edge to (edge_label, child); terminal nodes store the idiom under _END.
+    Chains without branches are merged into one edge, which keeps the node count
+    (and index load time) small for large dictionaries.
+    """
+    trie = {}
+    for idiom in idioms:
+        node = trie
+        for ch in idiom:
+            node = node.setdefault(ch, {})
+        node[_END] = idiom
+
+    def compress(node):
+        compressed = {}
+        for ch, child in node.items():
+            if ch == _END:
+                compressed[_END] = child
+                continue
+            label = ch
+            while len(child) == 1 and _END not in child:
+                (next_ch, next_child), = child.items()
+                label += next_ch
+                child = next_child
+            compressed[ch] = (label, compress(child))
+        return compressed
+
+    return compress(trie)
+
+def _is_word_char(ch):
+    # Same notion of a word character as the regex \b we used to match with
+    return ch.isalnum() or ch == "_"
+
+def _lower_same_length(text):
+    # re.IGNORECASE compares character by character, so keep positions aligned
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
 
 class IdiomReplacer:
-    def __init__(self, idioms_path="idioms.json"):
+    def __init__(self, idioms_path="idioms.json", index_path=None):
+        """
+        idioms_path: JSON list of {"idiom", "meaning"}.
+        index_path: optional precompiled index (see build_index). Used instead of the
+        JSON when it is at least as new, so large dictionaries don't get re-parsed on startup.
+        """
         if not os.path.exists(idioms_path):
              # check up one directory if not found in current
             if os.path.exists(os.path.join("..", idioms_path)):
                  idioms_path = os.path.join("..", idioms_path)
 
+        # Identifies this idiom list, e.g. for checkpoints that depend on it
+        self.signature = None
+        if os.path.exists(idioms_path):
+            stat = os.stat(idioms_path)
+            self.signature = [os.path.abspath(idioms_path), stat.st_size, stat.st_mtime_ns]
+
+        index = None
+        if index_path and self._index_is_fresh(index_path, idioms_path):
+            with open(index_path, "rb") as f:
+                index = pickle.load(f)
+            if index.get("version") != INDEX_VERSION:
+                index = None
+
+        if index is not None:
+            self.idioms_dict = index["idioms"]
+            self.sorted_idioms = index["order"]
+            self.trie = index["trie"]
+        else:
+            with open(idioms_path, "r") as f:
+                self.idioms_data = json.load(f)
+
+            self.idioms_dict = {item["idiom"].lower(): item["meaning"] for item in self.idioms_data}
+            # Sort by length descending to match longest idioms first
+            self.sorted_idioms = sorted(self.idioms_dict.keys(), key=len, reverse=True)
+            self.trie = _build_trie(self.sorted_idioms)
+
+        # Priority of each idiom when matches overlap: longer first, then file order
+        self.priority = {idiom: rank for rank, idiom in enumerate(self.sorted_idioms)}
+
+    @staticmethod
+    def _index_is_fresh(index_path, idioms_path):
+        if not os.path.exists(index_path):
+            return False
+        if not os.path.exists(idioms_path):
+            return True
+        return os.path.getmtime(index_path) >= os.path.getmtime(idioms_path)
+
+    @staticmethod
+    def build_index(idioms_path="idioms.json", index_path="idioms.index"):
+        """
+        Parses the idioms JSON once and writes the lookup table and trie to index_path.
+        """
         with open(idioms_path, "r") as f:
-            self.idioms_data = json.load(f)
-        
-        self.idioms_dict = {item["idiom"].lower(): item["meaning"] for item in self.idioms_data}
-        # Sort by length descending to match longest idioms first
-        self.sorted_idioms = sorted(self.idioms_dict.keys(), key=len, reverse=True)
+            idioms_data = json.load(f)
+        idioms_dict = {item["idiom"].lower(): item["meaning"] for item in idioms_data}
+        order = sorted(idioms_dict.keys(), key=len, reverse=True)
+        index = {"version": INDEX_VERSION, "idioms": idioms_dict, "order": order, "trie": _build_trie(order)}
+        with open(index_path, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return index_path
+
+    @staticmethod
+    def _is_boundary(text, i):
+        before = i > 0 and _is_word_char(text[i - 1])
+        after = i < len(text) and _is_word_char(text[i])
+        return before != after
 
     def replace(self, sentence):
         """
         Replaces idioms in the given sentence with their meanings.
         """
-        replaced_sentence = sentence
-        
-        for idiom in self.sorted_idioms:
-            # Use regex for whole phrase matching (case insensitive)
-            pattern = re.compile(r'\b' + re.escape(idiom) + r'\b', flags=re.IGNORECASE)
-            if pattern.search(replaced_sentence):
-                replaced_sentence = pattern.sub(self.idioms_dict[idiom], replaced_sentence)
-        
-        return replaced_sentence
+        # One pass over the text walks the trie from every word boundary and keeps
+        # the longest idiom that also ends on a word boundary
+        text = _lower_same_length(sentence)
+        length = len(text)
+        candidates = []
+        for start in range(length):
+            edge = self.trie.get(text[start])
+            if edge is None or not self._is_boundary(text, start):
+                continue
+            longest = None
+            end = start
+            while edge is not None:
+                label, child = edge
+                if not text.startswith(label, end):
+                    break
+                end += len(label)
+                if _END in child and self._is_boundary(text, end):
+                    longest = (end, child[_END])
+                edge = child.get(text[end]) if end < length else None
+            if longest:
+                end, idiom = longest
+                candidates.append((self.priority[idiom], start, end, idiom))
+        if not candidates:
+            return sentence
+
+        # Overlaps are resolved the way sequential longest-first replacement would
+        candidates.sort()
+        accepted = []
+        taken = []
+        for _, start, end, idiom in candidates:
+            if any(start < t_end and t_start < end for t_start, t_end in taken):
+                continue
+            taken.append((start, end))
+            accepted.append((start, end, idiom))
+
+        accepted.sort()
+        parts = []
+        position = 0
+        for start, end, idiom in accepted:
+            parts.append(sentence[position:start])
+            parts.append(self.idioms_dict[idiom])
+            position = end
+        parts.append(sentence[position:])
+        return "".join(parts)
@@ -0,0 +1,50 @@
+import numpy as np
+
+# How far the original soundtrack is turned down under dubbed lines, and how fast
+DUCK_DB = -18.0
+ATTACK_SEC = 0.08
+RELEASE_SEC = 0.3
+# The envelope is computed at 1 kHz and expanded block by block when applied
+CONTROL_HZ = 1000
+BLOCK_SAMPLES = 1 << 20
+
+
+def duck_envelope(spans, duration_sec, duck_db=DUCK_DB, attack_sec=ATTACK_SEC, release_sec=RELEASE_SEC):
+    """
+    Gain for the original soundtrack at CONTROL_HZ: 1 away from speech, duck_db inside
+    spans ((start, end) in seconds), ramping down over attack_sec before each span and
+    back up over release_sec after it. Vectorized, linear in the track length.
+    """
+    n = int(np.ceil(duration_sec * CONTROL_HZ)) + 1
+    # Difference array: +1 where a span opens, -1 where it closes; overlaps just stack
+    edges = np.zeros(n + 1, dtype=np.int32)
+    for start, end in spans:
+        first, last = max(int(start * CONTROL_HZ), 0), min(int(np.ceil(end * CONTROL_HZ)), n)
+        if last > first:
+            edges[first] += 1
+            edges[last] -= 1
+    ducked = np.cumsum(edges[:n]) > 0
+
+    index = np.arange(n, dtype=np.float64)
+    # Distance since the last ducked point and until the next one
+    last_on = np.maximum.accumulate(np.where(ducked, index, -np.inf))
+    next_on = np.minimum.accumulate(np.where(ducked, index, np.inf)[::-1])[::-1]
+    ramp = np.minimum((index - last_on) / max(release_sec * CONTROL_HZ, 1), (next_on - index) / max(attack_sec * CONTROL_HZ, 1))
+    duck = 10 ** (duck_db / 20)
+    return (duck + (1 - duck) * np.clip(ramp, 0, 1)).astype(np.float32)
+
+
+def mix_under(dub, original, envelope, sample_rate, background_gain=1.0):
+    """
+    Adds the original soundtrack (float in [-1, 1], same rate) under the dub (int16),
+    in place, scaled by the envelope from duck_envelope(). Works block by block so the
+    expanded envelope never has to exist for the whole track.
+    """
+    n = min(len(dub), len(original))
+    control = np.arange(len(envelope), dtype=np.float64) * sample_rate / CONTROL_HZ
+    for first in range(0, n, BLOCK_SAMPLES):
+        last = min(first + BLOCK_SAMPLES, n)
+        gain = np.interp(np.arange(first, last), control, envelope).astype(np.float32)
+        mixed = dub[first:last] + np.asarray(original[first:last], dtype=np.float32) * gain * (32767.0 * background_gain)
+        dub[first:last] = np.clip(np.round(mixed), -32768, 32767)
+    return dub
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import itertools
+import threading
+import contextlib
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Profiling is off unless enable() is called; every hook below then costs one
+# global lookup and returns a shared no-op context manager.
+_active = None
+_NULL = contextlib.nullcontext()
+_hook_installed = False
+_hook_lock = threading.Lock()
+# Subprocesses started since track_subprocesses(), by executable name
+_spawned = {}
+_spawned_lock = threading.Lock()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "cat", "args", "start", "cpu_start", "worker_cpu", "task")
+
+    def __init__(self, profiler, name, cat, args):
+        self.profiler = profiler
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.worker_cpu = 0.0
+
+    def __enter__(self):
+        try:
+            self.task = asyncio.current_task()
+        except RuntimeError:
+            self.task = None
+        self.cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler._finish(self, end, time.thread_time() - self.cpu_start)
+        return False
+
+    def add_worker_cpu(self, seconds):
+        """
+        Adds CPU time spent for this span in a worker process (see timed_call).
+        """
+        self.worker_cpu += seconds
+
+
+class Profiler:
+    """
+    Collects timed spans, counters and peak memory for one run.
+
+    Spans record wall time and the CPU time of the thread that opened them, plus any
+    CPU time reported from worker processes (timed_call), so pool work isn't lost.
+    A span spanning awaits also counts the event loop's other tasks meanwhile. Spans
+    opened inside asyncio tasks are exported as async events, so overlapping
+    segments get their own tracks.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.worker_cpu = 0.0
+        self.events = []
+        self.counters = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def span(self, name, cat="stage", args=None):
+        return _Span(self, name, cat, args)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _finish(self, span, end, cpu):
+        event = {
+            "name": span.name,
+            "cat": span.cat,
+            "start": span.start - self.started,
+            "wall": end - span.start,
+            "cpu": cpu + span.worker_cpu,
+            "tid": threading.get_ident(),
+            "async": span.task is not None,
+            "args": span.args,
+        }
+        with self._lock:
+            self.events.append(event)
+            self.worker_cpu += span.worker_cpu
+
+    def summary(self):
+        """
+        Per-span-name totals and latency percentiles, counters and peak RSS.
+        """
+        with self._lock:
+            events = list(self.events)
+            counters = dict(self.counters)
+        stages = {}
+        for event in events:
+            stages.setdefault(event["name"], []).append(event)
+        summary = {}
+        for name, group in stages.items():
+            walls = sorted(event["wall"] for event in group)
+            summary[name] = {
+                "cat": group[0]["cat"],
+                "count": len(group),
+                "wall_s": round(sum(walls), 6),
+                "cpu_s": round(sum(event["cpu"] for event in group), 6),
+                "p50_s": round(walls[len(walls) // 2], 6),
+                "p95_s": round(walls[min(int(len(walls) * 0.95), len(walls) - 1)], 6),
+                "max_s": round(walls[-1], 6),
+            }
+        return {
+            "wall_s": round(time.perf_counter() - self.started, 6),
+            "cpu_s": round(time.process_time() - self.cpu_started, 6),
+            "worker_cpu_s": round(self.worker_cpu, 6),
+            "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+            "children_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            "counters": counters,
+            "spans": summary,
+        }
+
+    def chrome_trace(self):
+        """
+        Trace Event Format, loadable in chrome://tracing or ui.perfetto.dev.
+        """
+        pid = os.getpid()
+        trace = []
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            ts = event["start"] * 1e6
+            args = dict(event["args"] or {}, cpu_ms=round(event["cpu"] * 1000, 3))
+            if event["async"]:
+                span_id = next(self._ids)
+                base = {"name": event["name"], "cat": event["cat"], "pid": pid, "tid": event["tid"], "id": span_id}
+                trace.append(dict(base, ph="b", ts=ts, args=args))
+                trace.append(dict(base, ph="e", ts=ts + event["wall"] * 1e6))
+            else:
+                trace.append({
+                    "name": event["name"], "cat": event["cat"], "ph": "X", "ts": ts,
+                    "dur": event["wall"] * 1e6, "pid": pid, "tid": event["tid"], "args": args,
+                })
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """
+        Writes the summary to path and the Chrome trace next to it (<name>.trace.json).
+        """
+        base, _ = os.path.splitext(path)
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        trace_path = base + ".trace.json"
+        with open(trace_path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path, trace_path
+
+
+def _peak_rss_mb(who):
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _audit(event, args):
+    # Counts every subprocess we start, including the ones pydub and whisper spawn
+    if event == "subprocess.Popen":
+        executable, argv = args[0], args[1]
+        if not executable:
+            executable = argv[0] if isinstance(argv, (list, tuple)) and argv else str(argv).split(" ")[0]
+        name = os.path.basename(str(executable))
+        with _spawned_lock:
+            _spawned[name] = _spawned.get(name, 0) + 1
+        if _active is not None:
+            _active.count(f"subprocess.{name}")
+
+
+def track_subprocesses():
+    """
+    Starts counting subprocess launches (see subprocess_counts). Called by enable();
+    the hook is installed once per process and stays, audit hooks can't be removed.
+    """
+    global _hook_installed
+    with _hook_lock:
+        if not _hook_installed:
+            # Only acts on subprocess.Popen
+            sys.addaudithook(_audit)
+            _hook_installed = True
+
+
+def subprocess_counts():
+    """
+    Subprocesses started by this process so far, by executable name.
+    """
+    with _spawned_lock:
+        return dict(_spawned)
+
+
+def enable():
+    """
+    Starts collecting. Returns the Profiler.
+    """
+    global _active
+    _active = Profiler()
+    track_subprocesses()
+    return _active
+
+
+def disable():
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def active():
+    return _active
+
+
+def span(name, cat="stage", **args):
+    """
+    Context manager timing a block; a shared no-op when profiling is disabled.
+    """
+    if _active is None:
+        return _NULL
+    return _active.span(name, cat, args or None)
+
+
+def count(name, n=1):
+    if _active is not None:
+        _active.count(name, n)
+
+
+def timed_call(fn, *args):
+    """
+    Runs fn(*args) and returns (result, CPU seconds it took). Meant to be submitted to
+    a process pool, where the parent can't see the CPU time; attach the figure to the
+    span with add_worker_cpu().
+    """
+    started = time.process_time()
+    result = fn(*args)
+    return result, time.process_time() - started
+
+
+def add_worker_cpu(span, seconds):
+    """
+    Adds worker CPU time to span, the value of `with profiling.span(...) as span`
+    (None when profiling is disabled).
+    """
+    if span is not None:
+        span.add_worker_cpu(seconds)
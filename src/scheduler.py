@@ -0,0 +1,58 @@
+import math
+import numpy as np
+
+# Fastest a clip may be played back, and how early it may start before its line
+MAX_TEMPO = 1.5
+MAX_LEAD_SEC = 0.25
+
+
+def plan_slots(starts, next_starts, lengths, end, max_tempo=MAX_TEMPO, max_lead=0):
+    """
+    Plans where every clip goes and how long it plays, all in samples.
+
+    starts: where each line starts in the original; next_starts: where the following
+    line starts (a clip may spill into the silence up to there); lengths: clip lengths
+    (0 for silent lines); end: where the track ends, or None for no limit.
+
+    Forward pass: a clip that fits before the next line is left alone; one that doesn't
+    first starts up to max_lead early, then is sped up, but never past max_tempo. What
+    still doesn't fit pushes the following lines back and is absorbed by later gaps.
+    Backward pass: if that drift runs past end, clips are pulled earlier (at most max_lead
+    before their line) and squeezed (at most to max_tempo) from the end backwards, so
+    nothing needs squeezing as a whole track afterwards. A clip that still doesn't fit
+    has its tail cut off rather than being played faster.
+    Returns (placed starts, planned lengths, kept lengths) as int arrays: each clip is
+    time-stretched to its planned length, then only the first kept samples are used.
+    """
+    n = len(lengths)
+    placed = np.zeros(n, dtype=np.int64)
+    planned = np.zeros(n, dtype=np.int64)
+    cursor = 0
+    for i in range(n):
+        length = int(lengths[i])
+        start = max(int(starts[i]), cursor)
+        room = max(int(next_starts[i]), start) - start
+        if length > room:
+            earliest = max(cursor, int(starts[i]) - max_lead, 0)
+            start -= min(start - earliest, length - room)
+            room = max(int(next_starts[i]), start) - start
+        placed[i] = start
+        planned[i] = length if length <= room else max(room, math.ceil(length / max_tempo))
+        if length:
+            cursor = start + int(planned[i])
+
+    kept = planned.copy()
+    if end is not None:
+        limit = int(end)
+        for i in reversed(range(n)):
+            if not lengths[i]:
+                placed[i] = min(placed[i], limit)
+                continue
+            if placed[i] + planned[i] > limit:
+                shortest = math.ceil(int(lengths[i]) / max_tempo)
+                earliest = min(max(int(starts[i]) - max_lead, 0), limit)
+                placed[i] = max(min(int(placed[i]), limit - shortest), earliest)
+                planned[i] = max(limit - placed[i], shortest)
+                kept[i] = limit - placed[i]
+            limit = placed[i]
+    return placed, planned, kept
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import asyncio
+import itertools
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .dubber import output_paths
+
+
+class JobQueue:
+    """
+    Priority queue of dubbing jobs run by a fixed number of worker threads that share
+    one DubbingEngine, so models, caches and the translation session stay warm.
+
+    Jobs with a higher priority run first; equal priorities run in submission order.
+    Each job gets its own workspace under workspace_root, removed when it succeeds.
+    Finished jobs are forgotten after finished_ttl seconds, or sooner once there are
+    more than max_finished of them, so a long-running service doesn't grow forever.
+    """
+
+    def __init__(self, engine, workspace_root="output/jobs", workers=1, keep_workspaces=False,
+                 finished_ttl=24 * 3600, max_finished=1000):
+        self.engine = engine
+        self.workspace_root = workspace_root
+        self.keep_workspaces = keep_workspaces
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        os.makedirs(workspace_root, exist_ok=True)
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, input_path, lang="es", output_path=None, priority=0, transcript=None):
+        """
+        Queues a job and returns its id. lang may list several languages ("es,hi").
+        transcript: optional .srt/.vtt/.json to use instead of Whisper.
+        """
+        langs = [code.strip() for code in lang.split(",") if code.strip()]
+        outputs = output_paths(input_path, langs, output_path)
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "input": input_path,
+            "lang": ",".join(langs),
+            "outputs": outputs,
+            "transcript": transcript,
+            "priority": priority,
+            "state": "queued",
+            "stage": None,
+            "progress": 0.0,
+            "error": None,
+            "submitted": time.time(),
+            "started": None,
+            "finished": None,
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        self._queue.put((-priority, next(self._order), job_id))
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _prune(self):
+        # Called with the lock held. Dicts keep insertion order, so the oldest come first.
+        finished = [job for job in self._jobs.values() if job["finished"] is not None]
+        expired = time.time() - self.finished_ttl
+        excess = len(finished) - self.max_finished
+        for i, job in enumerate(finished):
+            if i < excess or job["finished"] < expired:
+                del self._jobs[job["id"]]
+
+    def _work(self):
+        while True:
+            _, _, job_id = self._queue.get()
+            if job_id is None:
+                break
+            self._run(job_id)
+
+    def _run(self, job_id):
+        job = self.get(job_id)
+        workspace = os.path.join(self.workspace_root, job_id)
+        self._update(job_id, state="running", started=time.time())
+        progress = lambda stage, fraction: self._update(job_id, stage=stage, progress=round(fraction, 3))
+        # Only passed when given, so engines without subtitle support still work
+        extra = {"transcript": job["transcript"]} if job.get("transcript") else {}
+        try:
+            results = asyncio.run(self.engine.process_languages(
+                job["input"], job["outputs"], work_dir=workspace, progress=progress, **extra
+            ))
+            ok = all(results.values())
+            error = None if ok else "Dubbing failed for " + ", ".join(lang for lang, done in results.items() if not done)
+        except Exception as e:
+            ok, error = False, str(e)
+        with self._lock:
+            self._jobs[job_id].update(state="done" if ok else "failed", error=error, finished=time.time())
+            self._prune()
+        if ok and not self.keep_workspaces:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    def stop(self):
+        # Sentinels sort after every real job of the same priority
+        for _ in self._workers:
+            self._queue.put((float("inf"), next(self._order), None))
+        for worker in self._workers:
+            worker.join()
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs        {"input": path, "lang": "es,hi", "output": path, "priority": 0, "transcript": path} -> {"id": ...}
+    GET  /jobs        all jobs
+    GET  /jobs/<id>   one job's state, stage and progress
+    GET  /health
+    """
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        jobs = self.server.jobs
+        if self.path == "/health":
+            return self._send(200, {"ok": True})
+        if self.path == "/jobs":
+            return self._send(200, jobs.list())
+        if self.path.startswith("/jobs/"):
+            job = jobs.get(self.path[len("/jobs/"):])
+            if job:
+                return self._send(200, job)
+            return self._send(404, {"error": "unknown job"})
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            input_path = request["input"]
+            priority = int(request.get("priority", 0))
+        except (ValueError, KeyError, TypeError):
+            return self._send(400, {"error": "expected JSON with at least an 'input' path"})
+        if not os.path.exists(input_path):
+            return self._send(400, {"error": f"input file '{input_path}' not found"})
+        transcript = request.get("transcript")
+        if transcript and not os.path.exists(transcript):
+            return self._send(400, {"error": f"transcript '{transcript}' not found"})
+        job_id = self.server.jobs.submit(input_path, request.get("lang", "es"), request.get("output"), priority, transcript)
+        self._send(202, {"id": job_id})
+
+    def address_string(self):
+        # Unix socket clients have no (host, port) address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "local"
+
+    def log_message(self, format, *args):
+        # Polling would flood the log otherwise
+        if self.command != "GET":
+            super().log_message(format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def warm_up(engine):
+    """
+    Loads Whisper and the gender classifier so the first job doesn't pay for it.
+    """
+    try:
+        from utils.models import whisper_model, gender_classifier
+        if hasattr(engine.transcriber, "start"):
+            # Sharded: start the worker processes, they load the model themselves
+            engine.transcriber.start()
+        else:
+            whisper_model(engine.transcriber.model_size)
+        gender_classifier()
+    except Exception as e:
+        print(f"Model warm-up failed, models will load on the first job: {e}")
+
+
+def serve(engine, host="127.0.0.1", port=8765, socket_path=None, workers=1, warm=True):
+    """
+    Runs the job API until interrupted, on a Unix socket if socket_path is given,
+    otherwise on host:port.
+    """
+    jobs = JobQueue(engine, os.path.join(engine.output_dir, "jobs"), workers=workers)
+    if warm:
+        threading.Thread(target=warm_up, args=(engine,), daemon=True).start()
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, JobRequestHandler)
+        print(f"Serving dubbing jobs on unix:{socket_path} with {workers} worker(s)")
+    else:
+        server = ThreadingHTTPServer((host, port), JobRequestHandler)
+        print(f"Serving dubbing jobs on http://{host}:{server.server_port} with {workers} worker(s)")
+    server.jobs = jobs
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
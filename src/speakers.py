@@ -0,0 +1,147 @@
+import numpy as np
+
+# 25 ms windows every 10 ms, the usual framing for speech features
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+N_MELS = 40
+N_MFCC = 20
+
+
+def _mel_filterbank(sample_rate, n_fft, n_mels=N_MELS, fmin=20.0, fmax=None):
+    fmax = fmax or sample_rate / 2
+    hz_to_mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+    mel_to_hz = lambda mel: 700.0 * (10 ** (mel / 2595.0) - 1.0)
+    mel_points = np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    fbank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            fbank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            fbank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return fbank
+
+
+def _dct_matrix(n_mels=N_MELS, n_mfcc=N_MFCC):
+    # Orthonormal DCT-II, same as scipy.fft.dct(norm="ortho") on the mel axis
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    dct = np.cos(np.pi / n_mels * (n + 0.5) * k) * np.sqrt(2.0 / n_mels)
+    dct[0] /= np.sqrt(2.0)
+    return dct.astype(np.float32)
+
+
+def speaker_embeddings(speech, spans, sample_rate=16000):
+    """
+    Cheap speaker embedding per span: mean and standard deviation of its MFCCs
+    (c0, which mostly tracks loudness, is dropped).
+    speech: mono float array; spans: list of (start_sec, end_sec).
+    Returns an array of shape (len(spans), 2 * (N_MFCC - 1)).
+    """
+    frame = int(FRAME_SECONDS * sample_rate)
+    hop = int(HOP_SECONDS * sample_rate)
+    n_fft = 1 << (frame - 1).bit_length()
+    window = np.hamming(frame).astype(np.float32)
+    fbank = _mel_filterbank(sample_rate, n_fft)
+    dct = _dct_matrix()
+
+    embeddings = np.zeros((len(spans), 2 * (N_MFCC - 1)), dtype=np.float32)
+    for i, (start, end) in enumerate(spans):
+        chunk = np.asarray(speech[max(int(start * sample_rate), 0):max(int(end * sample_rate), 0)], dtype=np.float32)
+        if len(chunk) < frame:
+            chunk = np.pad(chunk, (0, frame - len(chunk)))
+        # All frames of the span at once via a strided view
+        frames = np.lib.stride_tricks.sliding_window_view(chunk, frame)[::hop] * window
+        power = np.abs(np.fft.rfft(frames, n=n_fft)) ** 2
+        mfcc = np.log(power @ fbank.T + 1e-10) @ dct.T
+        mfcc = mfcc[:, 1:]
+        embeddings[i] = np.concatenate([mfcc.mean(axis=0), mfcc.std(axis=0)])
+    return embeddings
+
+
+def _silhouette(distances, labels):
+    """
+    Mean silhouette coefficient for a precomputed square distance matrix.
+    """
+    clusters = np.unique(labels)
+    # Mean distance from every point to every cluster
+    to_cluster = np.stack([distances[:, labels == c].mean(axis=1) for c in clusters], axis=1)
+    sizes = np.array([(labels == c).sum() for c in clusters])
+    own = np.searchsorted(clusters, labels)
+    # Exclude the point itself from its own cluster's mean
+    own_size = sizes[own]
+    a = np.where(own_size > 1, to_cluster[np.arange(len(labels)), own] * own_size / np.maximum(own_size - 1, 1), 0.0)
+    to_cluster[np.arange(len(labels)), own] = np.inf
+    b = to_cluster.min(axis=1)
+    s = np.where(own_size > 1, (b - a) / np.maximum(np.maximum(a, b), 1e-12), 0.0)
+    return float(s.mean())
+
+
+def cluster_speakers(embeddings, max_speakers=8, min_silhouette=0.3, num_speakers=None):
+    """
+    Agglomerative (average-linkage, cosine) clustering of speaker embeddings.
+
+    Features are standardised across segments, the tree is cut into 2..max_speakers
+    clusters and the cut with the best silhouette wins. If even that one is below
+    min_silhouette there is no clear speaker structure and everything is one speaker.
+    Pass num_speakers to force a specific count.
+    Returns one integer cluster label per embedding, numbered from 0 in order of appearance.
+    """
+    if len(embeddings) < 3:
+        return np.zeros(len(embeddings), dtype=int)
+
+    from scipy.cluster.hierarchy import linkage, fcluster
+    from scipy.spatial.distance import pdist, squareform
+
+    features = embeddings - embeddings.mean(axis=0)
+    features /= features.std(axis=0) + 1e-8
+    condensed = pdist(features, metric="cosine")
+    tree = linkage(condensed, method="average")
+
+    if num_speakers:
+        labels = fcluster(tree, t=num_speakers, criterion="maxclust")
+    else:
+        distances = squareform(condensed)
+        labels, best = np.ones(len(embeddings), dtype=int), min_silhouette
+        for k in range(2, min(max_speakers, len(embeddings) - 1) + 1):
+            candidate = fcluster(tree, t=k, criterion="maxclust")
+            if len(np.unique(candidate)) < 2:
+                continue
+            score = _silhouette(distances, candidate)
+            if score > best:
+                labels, best = candidate, score
+
+    # Renumber in order of first appearance
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.argsort(np.argsort(first))
+    return order[inverse]
+
+
+def representative_spans(spans, labels, per_cluster=3):
+    """
+    Picks the longest spans of each cluster, which give the classifier the most to go on.
+    Returns {cluster: [span indices]}.
+    """
+    durations = np.array([end - start for start, end in spans])
+    picks = {}
+    for cluster in np.unique(labels):
+        members = np.flatnonzero(labels == cluster)
+        longest = members[np.argsort(-durations[members], kind="stable")][:per_cluster]
+        picks[int(cluster)] = [int(i) for i in longest]
+    return picks
+
+
+def vote(results):
+    """
+    Confidence-weighted vote over (label, confidence) results. Returns (label, confidence).
+    """
+    scores = {}
+    for label, confidence in results:
+        if label is not None:
+            scores[label] = scores.get(label, 0.0) + confidence
+    if not scores:
+        return None, 0.0
+    label = max(scores, key=scores.get)
+    return label, scores[label] / sum(scores.values())
@@ -0,0 +1,65 @@
+import numpy as np
+import soundfile as sf
+
+# Pauses are found on 20 ms frames, smoothed over 300 ms so a cut lands in a real
+# gap between phrases rather than a short dip inside a word
+SILENCE_FRAME_SEC = 0.02
+SILENCE_SMOOTH_SEC = 0.3
+
+
+def quietest_point(samples, sample_rate):
+    """
+    Returns the sample index at the centre of the quietest stretch of samples.
+    """
+    frame = max(int(SILENCE_FRAME_SEC * sample_rate), 1)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return len(samples) // 2
+    energy = np.square(samples[:n_frames * frame].astype(np.float32)).reshape(n_frames, frame).mean(axis=1)
+    smooth = max(int(SILENCE_SMOOTH_SEC / SILENCE_FRAME_SEC), 1)
+    if n_frames > smooth:
+        energy = np.convolve(energy, np.ones(smooth) / smooth, mode="same")
+    return int(np.argmin(energy)) * frame + frame // 2
+
+
+def silence_windows(source, window_sec=300.0, search_sec=30.0, sample_rate=16000):
+    """
+    Splits audio into consecutive windows of roughly window_sec, each cut at the
+    quietest point of its last search_sec so no window ends mid-sentence.
+    source: an audio file path, or a mono float array at sample_rate (e.g. the
+    np.memmap from ingest_audio). Only one window (plus the search margin) is
+    in memory at a time.
+    Yields (start_sec, samples) with samples as mono float32.
+    """
+    if isinstance(source, str):
+        with sf.SoundFile(source) as f:
+            read = lambda n: f.read(n, dtype="float32", always_2d=True)[:, 0]
+            yield from _windows(read, f.samplerate, window_sec, search_sec)
+        return
+
+    position = 0
+    def read(n):
+        nonlocal position
+        block = source[position:position + n]
+        position += len(block)
+        return block
+    yield from _windows(read, sample_rate, window_sec, search_sec)
+
+
+def _windows(read, sample_rate, window_sec, search_sec):
+    window = int(window_sec * sample_rate)
+    search = min(int(search_sec * sample_rate), window // 2)
+    carry = np.zeros(0, dtype=np.float32)
+    start = 0
+    while True:
+        block = read(window - len(carry))
+        chunk = np.concatenate([carry, np.asarray(block, dtype=np.float32)])
+        if len(chunk) < window:
+            # End of input: whatever is left is the last window
+            if len(chunk):
+                yield start / sample_rate, chunk
+            return
+        cut = window - search + quietest_point(chunk[window - search:], sample_rate)
+        yield start / sample_rate, chunk[:cut]
+        carry = chunk[cut:]
+        start += cut
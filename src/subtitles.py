@@ -0,0 +1,104 @@
+import os
+import re
+import json
+
+# 00:01:02,345 (SRT) or 01:02.345 / 00:01:02.345 (WebVTT)
+_TIME = r"(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})"
+_CUE_TIMES = re.compile(_TIME + r"\s*-->\s*" + _TIME)
+# <i>, <b>, <font ...>, WebVTT <c.x>/<v Speaker>/<00:00:01.000>, and SSA overrides like {\an8}
+_MARKUP = re.compile(r"<[^>]*>|\{\\[^}]*\}")
+
+
+def _seconds(hours, minutes, seconds, millis):
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(millis.ljust(3, "0")) / 1000
+
+
+def parse_subtitles(text):
+    """
+    Parses SRT or WebVTT cues into segments like Transcriber.transcribe returns:
+    [{"start", "end", "text"}], seconds, in cue order. Markup is stripped and the
+    lines of a cue joined with spaces; cues without text are skipped.
+    """
+    segments = []
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n").replace("\r", "\n")):
+        lines = [line.strip() for line in block.strip().split("\n")]
+        for i, line in enumerate(lines):
+            times = _CUE_TIMES.search(line)
+            if times:
+                break
+        else:
+            # WEBVTT header, NOTE / STYLE blocks, stray text
+            continue
+        caption = " ".join(_MARKUP.sub("", line) for line in lines[i + 1:])
+        caption = re.sub(r"\s+", " ", caption).strip()
+        if caption:
+            segments.append({
+                "start": round(_seconds(*times.groups()[:4]), 3),
+                "end": round(_seconds(*times.groups()[4:]), 3),
+                "text": caption,
+            })
+    return segments
+
+
+def parse_whisper_json(data):
+    """
+    Segments from Whisper's JSON output ({"segments": [...]}) or a bare list of
+    {"start", "end", "text"}. Other fields are dropped.
+    """
+    segments = data.get("segments") if isinstance(data, dict) else data
+    if not isinstance(segments, list):
+        raise ValueError("expected a list of segments or an object with \"segments\"")
+    try:
+        return [
+            {"start": float(seg["start"]), "end": float(seg["end"]), "text": str(seg["text"]).strip()}
+            for seg in segments if str(seg.get("text", "")).strip()
+        ]
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise ValueError(f"bad segment in JSON transcript: {e}")
+
+
+def load_transcript(path):
+    """
+    Reads a transcript from an .srt, .vtt or Whisper .json file.
+    Raises ValueError if it can't be parsed or has no segments.
+    """
+    with open(path, "r", encoding="utf-8-sig") as f:
+        content = f.read()
+    if os.path.splitext(path)[1].lower() == ".json":
+        try:
+            segments = parse_whisper_json(json.loads(content))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path} is not valid JSON: {e}")
+    else:
+        segments = parse_subtitles(content)
+    if not segments:
+        raise ValueError(f"No subtitle cues found in {path}")
+    return segments
+
+
+def check_transcript(segments, duration_sec=None, tolerance_sec=2.0):
+    """
+    Sanity checks before a transcript replaces Whisper: every segment is a dict with
+    numeric start/end and text, has a positive length, and the cues fit the video (a
+    transcript for another cut or episode usually doesn't). Returns the segments sorted
+    by start; raises ValueError otherwise.
+    """
+    if not isinstance(segments, list):
+        raise ValueError("Transcript must be a list of segments")
+    for i, seg in enumerate(segments):
+        if not isinstance(seg, dict) or not {"start", "end", "text"} <= seg.keys():
+            raise ValueError(f"Segment {i} needs start, end and text: {seg!r}")
+        if not all(isinstance(seg[key], (int, float)) and not isinstance(seg[key], bool) for key in ("start", "end")):
+            raise ValueError(f"Segment {i} has non-numeric timing: {seg['start']!r} -> {seg['end']!r}")
+        if not isinstance(seg["text"], str):
+            raise ValueError(f"Segment {i} text isn't a string: {seg['text']!r}")
+        if seg["start"] < 0 or seg["end"] <= seg["start"]:
+            raise ValueError(f"Segment {i} has bad timing: {seg['start']}s -> {seg['end']}s")
+    segments = sorted(segments, key=lambda seg: seg["start"])
+    if duration_sec and segments:
+        last_end = max(seg["end"] for seg in segments)
+        if last_end > duration_sec + tolerance_sec:
+            raise ValueError(
+                f"Transcript runs to {last_end:.1f}s but the video is {duration_sec:.1f}s long; wrong file or frame rate?"
+            )
+    return segments
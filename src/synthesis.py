@@ -0,0 +1,32 @@
+import os
+import numpy as np
+from .audio_utils import time_stretch
+try:
+    from utils.utils import female_to_male_array
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from utils.utils import female_to_male_array
+
+
+def fit_clip(samples, sample_rate, target_samples, to_male=False, f0_method="yin"):
+    """
+    CPU stage of segment synthesis: optional female->male conversion, then
+    speed up the clip if it is longer than target_samples (None: leave the length
+    to the scheduler, see src/scheduler.py).
+
+    Module level (not a method) so it can be shipped to a process pool.
+    Takes and returns a mono int16 array.
+    """
+    if to_male:
+        try:
+            male = female_to_male_array(samples.astype(np.float32) / 32768.0, sample_rate, f0_method=f0_method)
+            samples = np.clip(np.round(male * 32768.0), -32768, 32767).astype(np.int16)
+        except Exception as e:
+            print(f"Voice conversion failed: {e}")
+
+    # If TTS is shorter than target, the rest of the slot stays silent.
+    # If TTS is longer, we must speed it up.
+    if target_samples and len(samples) > target_samples:
+        samples = time_stretch(samples, target_samples, sample_rate)
+    return samples
@@ -0,0 +1,69 @@
+import numpy as np
+
+# gTTS returns 24kHz mono mp3, so assembling the dub at that rate avoids resampling every clip.
+DUB_SAMPLE_RATE = 24000
+
+
+def audiosegment_to_array(audio, sample_rate=DUB_SAMPLE_RATE):
+    """
+    Converts a pydub AudioSegment to a mono int16 NumPy array at sample_rate.
+    """
+    audio = audio.set_frame_rate(sample_rate).set_channels(1).set_sample_width(2)
+    return np.array(audio.get_array_of_samples(), dtype=np.int16)
+
+
+class Timeline:
+    """
+    Single preallocated PCM buffer the dub is assembled into.
+
+    Clips are written in place at their sample offset instead of concatenating
+    AudioSegments, so building the track is linear in the number of segments and
+    only one copy of the track is ever held in memory.
+    """
+
+    def __init__(self, duration_sec, sample_rate=DUB_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.buffer = np.zeros(self.to_samples(duration_sec), dtype=np.int16)
+        # High-water mark: number of samples covered by the dub so far
+        self.end = 0
+
+    def to_samples(self, seconds):
+        return max(0, int(round(seconds * self.sample_rate)))
+
+    @property
+    def duration(self):
+        return self.end / self.sample_rate
+
+    def _ensure(self, num_samples):
+        # Whisper timestamps can run past the probed duration; grow geometrically so this stays rare.
+        if num_samples > len(self.buffer):
+            grown = np.zeros(max(num_samples, int(len(self.buffer) * 1.5)), dtype=np.int16)
+            grown[:len(self.buffer)] = self.buffer
+            self.buffer = grown
+
+    def place(self, samples, start_sec):
+        """
+        Writes samples into the timeline starting at start_sec.
+        Returns the end position of the clip in seconds.
+        """
+        offset = self.to_samples(start_sec)
+        end = offset + len(samples)
+        self._ensure(end)
+        self.buffer[offset:end] = samples
+        self.end = max(self.end, end)
+        return end / self.sample_rate
+
+    def fit(self, duration_sec):
+        """
+        Pads with silence or trims so the timeline is exactly duration_sec long.
+        """
+        target = self.to_samples(duration_sec)
+        self._ensure(target)
+        self.buffer[target:] = 0
+        self.end = target
+
+    def samples(self):
+        """
+        Returns a view of the assembled track (no copy).
+        """
+        return self.buffer[:self.end]
@@ -1,19 +1,186 @@
-import whisper
+import os
+import re
+import threading
 import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .streaming import silence_windows
+try:
+    from utils.models import whisper_model, whisper_weights_path
+except ImportError:
+    import sys
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from utils.models import whisper_model, whisper_weights_path
 
 # Suppress warnings from whisper/torch
 warnings.filterwarnings("ignore")
 
 class Transcriber:
+    # Whisper installs kv-cache hooks on the shared model for each decode, so two
+    # transcriptions must not run on it at the same time (e.g. concurrent server jobs)
+    _model_lock = threading.Lock()
+
     def __init__(self, model_size="medium"):
-        print(f"Loading Whisper model ({model_size})...")
-        self.model = whisper.load_model(model_size)
+        # Whisper is loaded on the first transcribe() call, not here
+        self.model_size = model_size
+
+    @property
+    def model(self):
+        return whisper_model(self.model_size)
 
     def transcribe(self, audio_path, language="en"):
         """
         Transcribes audio file and returns segments.
+        audio_path can also be a 16 kHz mono float32 array (timestamps are relative to it).
         """
-        print(f"Transcribing {audio_path}...")
-        result = self.model.transcribe(audio_path, language=language)
+        model = self.model
+        if isinstance(audio_path, str):
+            print(f"Transcribing {audio_path}...")
+        else:
+            print(f"Transcribing {len(audio_path) / 16000:.0f}s of audio...")
+        with self._model_lock:
+            result = model.transcribe(audio_path, language=language)
         return result.get("segments", [])
 
+
+# Model of a ShardedTranscriber worker process, set up by _init_worker
+_worker_model = None
+
+
+def quantize_int8(model):
+    """
+    int8 dynamic quantization of a model's Linear layers, in place. Whisper's layers are
+    an nn.Linear subclass, which quantize_dynamic refuses to convert, so they are swapped
+    for plain nn.Linear sharing the same weights first.
+    """
+    import torch
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None, device="meta")
+                plain.weight, plain.bias = child.weight, child.bias
+                setattr(module, name, plain)
+    # inplace: a copy would pull every mmap'd weight into private memory
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def _init_worker(weights_path, quantize, threads):
+    global _worker_model
+    import torch
+    import whisper
+    torch.set_num_threads(threads)
+    # mmap: the weights stay in the page cache, shared by every worker
+    checkpoint = torch.load(weights_path, map_location="cpu", mmap=True, weights_only=True)
+    # Built on the meta device so no fp32 copy is allocated; assign=True takes the mmap'd tensors
+    with torch.device("meta"):
+        model = whisper.model.Whisper(whisper.model.ModelDimensions(**checkpoint["dims"]))
+    model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+    # Non-persistent buffers aren't in the checkpoint and would stay on meta
+    dims = model.dims
+    model.decoder.mask = torch.full((dims.n_text_ctx, dims.n_text_ctx), float("-inf")).triu_(1)
+    heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+    heads[dims.n_text_layer // 2:] = True
+    model.alignment_heads = heads.to_sparse()
+    model.eval()
+    if quantize:
+        # int8 weights are private to each worker, but a quarter of the size
+        model = quantize_int8(model)
+    _worker_model = model
+
+
+def _transcribe_shard(audio, language):
+    result = _worker_model.transcribe(audio, language=language, fp16=False)
+    return [{"start": seg["start"], "end": seg["end"], "text": seg["text"]} for seg in result.get("segments", [])]
+
+
+def _normalized(text):
+    return re.sub(r"[^\w ]", "", text.lower()).strip()
+
+
+def stitch_shards(shards):
+    """
+    Joins per-shard segments into one transcript.
+    shards: (offset_sec, next_offset_sec or None, segments with shard-relative times).
+    Segments starting in the overlap past next_offset_sec belong to the next shard,
+    and a segment repeating the text of the one before it at an edge is dropped.
+    """
+    stitched = []
+    for offset, next_offset, segments in shards:
+        for seg in segments:
+            start, end = seg["start"] + offset, seg["end"] + offset
+            if next_offset is not None and start >= next_offset:
+                continue
+            if stitched and start < stitched[-1]["end"]:
+                text, previous = _normalized(seg["text"]), _normalized(stitched[-1]["text"])
+                if text and (text in previous or previous in text):
+                    continue
+            stitched.append({"start": round(start, 3), "end": round(end, 3), "text": seg["text"]})
+    return stitched
+
+
+class ShardedTranscriber:
+    """
+    Transcriber for CPU-only hosts: the audio is cut at pauses into shards of about
+    shard_sec and each shard is transcribed by its own worker process. Workers
+    memory-map one copy of the weights (see whisper_weights_path); quantize=True
+    runs them as int8 with dynamic quantization.
+    """
+
+    def __init__(self, model_size="medium", workers=None, shard_sec=60.0, overlap_sec=1.0, quantize=False):
+        self.size = model_size
+        # Used in checkpoint keys: int8 output differs slightly
+        self.model_size = f"{model_size}-int8" if quantize else model_size
+        self.workers = workers or os.cpu_count()
+        self.shard_sec = shard_sec
+        self.overlap_sec = overlap_sec
+        self.quantize = quantize
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the worker processes (otherwise done on the first transcribe()).
+        """
+        with self._lock:
+            if self._pool is None:
+                threads = max(1, os.cpu_count() // self.workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    # Not forked: the parent may already hold torch threads or a model
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(whisper_weights_path(self.size), self.quantize, threads),
+                )
+        return self._pool
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def shards(self, audio, sample_rate=16000):
+        """
+        (offset_sec, next_offset_sec, samples) per shard, each running overlap_sec
+        into the next one so words at a cut aren't lost.
+        """
+        offsets = [start for start, _ in silence_windows(audio, self.shard_sec, min(10.0, self.shard_sec / 4), sample_rate)]
+        overlap = int(self.overlap_sec * sample_rate)
+        for i, offset in enumerate(offsets):
+            next_offset = offsets[i + 1] if i + 1 < len(offsets) else None
+            end = len(audio) if next_offset is None else int(next_offset * sample_rate) + overlap
+            yield offset, next_offset, np.ascontiguousarray(audio[int(offset * sample_rate):end], dtype=np.float32)
+
+    def transcribe(self, audio_path, language="en"):
+        """
+        Same as Transcriber.transcribe, spread over the worker processes.
+        """
+        if isinstance(audio_path, str):
+            import whisper
+            audio_path = whisper.load_audio(audio_path)
+        pool = self.start()
+        shards = list(self.shards(audio_path))
+        print(f"Transcribing {len(audio_path) / 16000:.0f}s of audio in {len(shards)} shard(s) on {self.workers} worker(s)...")
+        futures = [(offset, next_offset, pool.submit(_transcribe_shard, samples, language)) for offset, next_offset, samples in shards]
+        return stitch_shards([(offset, next_offset, future.result()) for offset, next_offset, future in futures])
@@ -0,0 +1,138 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+
+
+def normalize_text(text):
+    """
+    Canonical form used for cache keys: NFC, trimmed, single spaces.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class TranslationCache:
+    """
+    Persistent translation cache backed by SQLite.
+
+    Entries are keyed by a hash of (normalized text, source, target). When the
+    stored text exceeds max_bytes the least recently used entries are evicted.
+    Hits only refresh last_used in memory; the timestamps are written in one
+    transaction by flush(), on put(), close(), or once flush_every hits pile up.
+    """
+
+    def __init__(self, path="output/cache/translations.sqlite", max_bytes=64 * 1024 * 1024, flush_every=256):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Translations are looked up from executor threads, so share one connection under a lock
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY, translation TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+
+    @staticmethod
+    def make_key(text, source, target):
+        raw = "\x00".join([normalize_text(text), source, target])
+        return hashlib.sha256(raw.encode("utf8")).hexdigest()
+
+    def get(self, text, source, target):
+        """
+        Returns the cached translation, or None on a miss.
+        """
+        key = self.make_key(text, source, target)
+        with self._lock:
+            row = self._conn.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.flush_every:
+                self._flush()
+            return row[0]
+
+    def flush(self):
+        """
+        Writes the recency of entries hit since the last flush.
+        """
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._touched:
+            return
+        self._conn.executemany(
+            "UPDATE translations SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key, last_used in self._touched.items()],
+        )
+        self._touched.clear()
+        self._conn.commit()
+
+    def put(self, text, source, target, translation):
+        key = self.make_key(text, source, target)
+        size = len(key) + len(translation.encode("utf8"))
+        with self._lock:
+            # Pending hits first, so eviction doesn't drop something just used
+            self._flush()
+            old = self._conn.execute("SELECT size FROM translations WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, translation, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, translation, size, time.time()),
+            )
+            self._size += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop least recently used entries in chunks until we're back under budget
+        while self._size > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM translations ORDER BY last_used LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if self._size <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self._size -= size
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    @property
+    def size_bytes(self):
+        return self._size
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+            "bytes": self._size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
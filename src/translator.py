@@ -1,26 +1,173 @@
-from deep_translator import GoogleTranslator
 import asyncio
+import threading
+from .translation_cache import normalize_text
+from .http_client import HTTPClient
+from . import profiling
 
-class TextTranslator:
+class GoogleBackend:
+    """
+    Default translation backend. Reuses one GoogleTranslator per thread and
+    language pair instead of building a new one for every segment
+    (GoogleTranslator keeps per-request state, so it isn't shared across threads).
+    """
     def __init__(self):
-        # No persistent session needed like googletrans
-        pass
+        self._local = threading.local()
 
-    async def translate_text(self, text, dest_lang):
+    def translate(self, text, source, target):
+        # Imported here: deep_translator is slow to import and only this backend needs it
+        from deep_translator import GoogleTranslator
+        translators = self._local.__dict__.setdefault("translators", {})
+        if (source, target) not in translators:
+            translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        return translators[(source, target)].translate(text)
+
+class GoogleHTTPBackend:
+    """
+    Google Translate's web endpoint over a pooled, rate-limit-aware HTTPClient.
+    base_url can point at a local stub for tests.
+    """
+    def __init__(self, client=None, base_url="https://translate.googleapis.com"):
+        self.client = client or HTTPClient()
+        self.base_url = base_url.rstrip("/")
+
+    def translate(self, text, source, target):
+        # POST so packed requests aren't limited by URL length
+        response = self.client.post(
+            f"{self.base_url}/translate_a/single",
+            params={"client": "gtx", "sl": source, "tl": target, "dt": "t"},
+            data={"q": text},
+        )
+        # [[["translated sentence", "source sentence", ...], ...], ...]
+        return "".join(part[0] for part in response.json()[0] if part and part[0])
+
+class TextTranslator:
+    # Segments are packed into one request, one per line. Normalized text never contains newlines.
+    PACK_DELIMITER = "\n"
+
+    def __init__(self, backend=None, cache=None, source="auto", max_concurrency=4, pack_size=20, max_pack_chars=4000):
+        """
+        backend: object with translate(text, source, target), defaults to GoogleHTTPBackend.
+        cache: optional TranslationCache.
+        max_concurrency: max requests in flight during translate_batch.
+        pack_size / max_pack_chars: limits for packing several segments into one request.
+        """
+        self.backend = backend or GoogleHTTPBackend()
+        self.cache = cache
+        self.source = source
+        self.max_concurrency = max_concurrency
+        self.pack_size = pack_size
+        self.max_pack_chars = max_pack_chars
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+
+    def _request(self, text, dest_lang):
+        with self._requests_lock:
+            self.requests += 1
+        with profiling.span("translate.request", "network", chars=len(text)):
+            return self.backend.translate(text, self.source, dest_lang)
+
+    def _cached(self, text, dest_lang):
+        if self.cache is None:
+            return None
+        return self.cache.get(text, self.source, dest_lang)
+
+    def _store(self, text, dest_lang, translation):
+        if self.cache is not None and translation:
+            self.cache.put(text, self.source, dest_lang, translation)
+
+    def _translate_one(self, text, dest_lang, check_cache=True):
+        cached = self._cached(text, dest_lang) if check_cache else None
+        if cached is not None:
+            return cached
         try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: GoogleTranslator(source="auto", target=dest_lang).translate(text)
-            )
+            result = self._request(text, dest_lang)
+            self._store(text, dest_lang, result)
             return result
         except Exception as e:
             print(f"Translation error for '{text}': {e}")
-            return text
+            return None
+
+    def _translate_pack(self, texts, dest_lang):
+        """
+        Translates several (uncached, normalized) texts with a single request.
+        Falls back to one request per text if the reply can't be split back up.
+        """
+        if len(texts) == 1:
+            return [self._translate_one(texts[0], dest_lang, check_cache=False)]
+        try:
+            result = self._request(self.PACK_DELIMITER.join(texts), dest_lang) or ""
+            parts = [p.strip() for p in result.split(self.PACK_DELIMITER)]
+            if len(parts) == len(texts):
+                for text, part in zip(texts, parts):
+                    self._store(text, dest_lang, part)
+                return parts
+            print(f"Packed translation returned {len(parts)} lines for {len(texts)} segments, retrying one by one.")
+        except Exception as e:
+            print(f"Packed translation error: {e}")
+        return [self._translate_one(text, dest_lang, check_cache=False) for text in texts]
+
+    def _make_packs(self, texts):
+        packs, current, chars = [], [], 0
+        for text in texts:
+            if current and (len(current) >= self.pack_size or chars + len(text) + 1 > self.max_pack_chars):
+                packs.append(current)
+                current, chars = [], 0
+            current.append(text)
+            chars += len(text) + 1
+        if current:
+            packs.append(current)
+        return packs
+
+    async def translate_text(self, text, dest_lang):
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(None, self._translate_one, text, dest_lang)
+        return text if result is None else result
 
     async def translate_batch(self, texts, dest_lang="es"):
-        tasks = [self.translate_text(text, dest_lang) for text in texts]
-        return await asyncio.gather(*tasks)
+        """
+        Translates a list of texts, preserving order.
+        Cache hits are answered locally, the rest are packed into as few requests as possible.
+        Lines that couldn't be translated (request failed) come back as None.
+        """
+        results = list(texts)
+        pending = {}
+        for i, text in enumerate(texts):
+            normalized = normalize_text(text)
+            if not normalized:
+                continue
+            cached = self._cached(normalized, dest_lang)
+            if cached is not None:
+                results[i] = cached
+            else:
+                # Repeated lines in the same video only need translating once
+                pending.setdefault(normalized, []).append(i)
+        if self.cache is not None:
+            self.cache.flush()
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_pack(pack):
+            async with semaphore:
+                return await loop.run_in_executor(None, self._translate_pack, pack, dest_lang)
+
+        packs = self._make_packs(list(pending))
+        translated = await asyncio.gather(*[run_pack(pack) for pack in packs])
+        for pack, pack_results in zip(packs, translated):
+            for text, result in zip(pack, pack_results):
+                for i in pending[text]:
+                    results[i] = result
+        return results
 
     def translate_sync(self, text, dest_lang):
-        return GoogleTranslator(source="auto", target=dest_lang).translate(text)
\ No newline at end of file
+        result = self._translate_one(text, dest_lang)
+        return text if result is None else result
+
+    def stats(self):
+        stats = {"requests": self.requests}
+        client = getattr(self.backend, "client", None)
+        if client is not None:
+            stats["throttled"] = client.throttles
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+        return stats
@@ -1,9 +1,25 @@
 from gtts import gTTS
+import io
 import os
+import re
+import base64
+from urllib.parse import urlsplit
+from .timeline import DUB_SAMPLE_RATE
+from .audio_utils import decode_mp3
+from .http_client import HTTPClient
+from . import profiling
 
 class TTSGenerator:
-    def __init__(self):
-        pass
+    def __init__(self, tld="com", slow=False):
+        self.tld = tld
+        self.slow = slow
+
+    @property
+    def voice_settings(self):
+        """
+        Everything besides text and language that changes the generated voice (used for cache keys).
+        """
+        return {"engine": "gtts", "tld": self.tld, "slow": self.slow}
 
     def generate_audio(self, text, language, output_path):
         """
@@ -14,9 +30,68 @@ class TTSGenerator:
             return False
 
         try:
-            tts = gTTS(text=text, lang=language)
-            tts.save(output_path)
+            mp3 = self._fetch_mp3(text, language)
+            with open(output_path, "wb") as f:
+                f.write(mp3)
             return True
         except Exception as e:
             print(f"TTS Error for '{text}': {e}")
             return False
+
+    def synthesize(self, text, language, sample_rate=DUB_SAMPLE_RATE):
+        """
+        Generates audio from text using gTTS without touching disk.
+        Returns a mono int16 array at sample_rate, or None if it failed.
+        """
+        if not text or not text.strip():
+            return None
+
+        try:
+            with profiling.span("tts.request", "network", chars=len(text)):
+                mp3 = self._fetch_mp3(text, language)
+            with profiling.span("tts.decode", "cpu"):
+                return decode_mp3(mp3, sample_rate)
+        except Exception as e:
+            print(f"TTS Error for '{text}': {e}")
+            return None
+
+    def _fetch_mp3(self, text, language):
+        mp3 = io.BytesIO()
+        gTTS(text=text, lang=language, tld=self.tld, slow=self.slow).write_to_fp(mp3)
+        return mp3.getvalue()
+
+
+class HTTPTTSGenerator(TTSGenerator):
+    """
+    Same voice as TTSGenerator, but gTTS's requests go through a pooled,
+    rate-limit-aware HTTPClient instead of a new connection per text chunk.
+    base_url can point at a local stub for tests.
+    This leans on gTTS internals (pinned in requirements.txt); if they change,
+    it falls back to gTTS's own public write_to_fp.
+    """
+
+    # gTTS returns each chunk's MP3 base64-encoded inside the RPC reply
+    _AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+    def __init__(self, tld="com", slow=False, client=None, base_url=None):
+        super().__init__(tld, slow)
+        self.client = client or HTTPClient()
+        self.base_url = base_url.rstrip("/") if base_url else None
+
+    def _fetch_mp3(self, text, language):
+        # gTTS still does the language check, chunking and RPC packing
+        tts = gTTS(text=text, lang=language, tld=self.tld, slow=self.slow)
+        if not hasattr(tts, "_prepare_requests"):
+            return super()._fetch_mp3(text, language)
+        audio = []
+        for request in tts._prepare_requests():
+            url = request.url
+            if self.base_url:
+                url = self.base_url + urlsplit(url).path
+            response = self.client.request(request.method, url, data=request.body, headers=dict(request.headers))
+            found = self._AUDIO.search(response.text)
+            if not found:
+                print("Unexpected TTS response, falling back to gTTS")
+                return super()._fetch_mp3(text, language)
+            audio.append(base64.b64decode(found.group(1)))
+        return b"".join(audio)
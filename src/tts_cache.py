@@ -0,0 +1,169 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from .translation_cache import normalize_text
+
+
+class TTSCache:
+    """
+    Cache of synthesized speech, stored as decoded PCM (.npy) so a hit skips
+    both the TTS request and the mp3 decode.
+
+    Disk entries are evicted least-recently-used once they exceed max_bytes.
+    An optional in-memory tier keeps up to memory_bytes of the hottest clips.
+    """
+
+    def __init__(self, root="output/cache/tts", max_bytes=512 * 1024 * 1024, memory_bytes=32 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._disk_size = sum(entry.stat().st_size for entry in os.scandir(root) if entry.name.endswith(".npy"))
+
+    @staticmethod
+    def make_key(text, language, sample_rate, voice_settings=None):
+        raw = json.dumps([normalize_text(text), language, sample_rate, voice_settings or {}], sort_keys=True)
+        return hashlib.sha256(raw.encode("utf8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".npy")
+
+    def get(self, key):
+        """
+        Returns the cached int16 array, or None on a miss.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            samples = np.load(path)
+            # mtime doubles as the LRU timestamp for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self._remember(key, samples)
+        return samples
+
+    def put(self, key, samples):
+        samples = np.ascontiguousarray(samples, dtype=np.int16)
+        path = self._path(key)
+        # Write then rename, so a concurrent reader never sees a partial file
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, samples)
+        size = os.path.getsize(temp_path)
+        old_size = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._disk_size += size - old_size
+            self._remember(key, samples)
+            if self._disk_size > self.max_bytes:
+                self._evict()
+
+    def _remember(self, key, samples):
+        if not self.memory_bytes or samples.nbytes > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_size -= self._memory.pop(key).nbytes
+        # Shared between segments, so the cached copy is read-only; the caller's array stays writable
+        samples = samples.copy()
+        samples.setflags(write=False)
+        self._memory[key] = samples
+        self._memory_size += samples.nbytes
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= evicted.nbytes
+
+    def _evict(self):
+        # Scan once and trim to 90% of the budget so we don't rescan on every put
+        entries = sorted(
+            (entry for entry in os.scandir(self.root) if entry.name.endswith(".npy")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        budget = self.max_bytes * 0.9
+        for entry in entries:
+            if self._disk_size <= budget:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._disk_size -= size
+            self._memory.pop(entry.name[:-len(".npy")], None)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "bytes": self._disk_size,
+        }
+
+
+class CachedTTS:
+    """
+    Sits in front of a TTSGenerator and answers repeated lines from a TTSCache.
+    Exposes the same synthesize() as the generator.
+    """
+
+    def __init__(self, generator, cache):
+        self.generator = generator
+        self.cache = cache
+        # Time spent on misses, used to estimate what the hits saved
+        self.synthesis_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, language, sample_rate):
+        if not text or not text.strip():
+            return None
+        key = self.cache.make_key(text, language, sample_rate, getattr(self.generator, "voice_settings", None))
+        samples = self.cache.get(key)
+        if samples is not None:
+            return samples
+
+        started = time.perf_counter()
+        samples = self.generator.synthesize(text, language, sample_rate)
+        with self._lock:
+            self.synthesis_seconds += time.perf_counter() - started
+        if samples is not None:
+            self.cache.put(key, samples)
+        return samples
+
+    @property
+    def voice_settings(self):
+        return getattr(self.generator, "voice_settings", None)
+
+    def generate_audio(self, text, language, output_path):
+        return self.generator.generate_audio(text, language, output_path)
+
+    def stats(self):
+        stats = self.cache.stats()
+        misses = stats["misses"]
+        stats["synthesis_seconds"] = self.synthesis_seconds
+        stats["saved_seconds"] = self.synthesis_seconds / misses * stats["hits"] if misses else 0.0
+        return stats
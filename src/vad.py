@@ -0,0 +1,100 @@
+import numpy as np
+
+# 30 ms frames, analysed in blocks so a long track never needs all its spectra at once
+FRAME_SECONDS = 0.03
+BLOCK_FRAMES = 2048
+
+
+def frame_features(audio, sample_rate=16000, frame_seconds=FRAME_SECONDS, band=(100.0, 4000.0)):
+    """
+    Per-frame energy (dBFS) and spectral flatness in the speech band for non-overlapping
+    frames. Flatness is near 0 for voiced speech (harmonics) and ~0.56 for white noise.
+    """
+    frame = int(frame_seconds * sample_rate)
+    n_frames = len(audio) // frame
+    n_fft = 1 << (frame - 1).bit_length()
+    window = np.hanning(frame).astype(np.float32)
+    lo, hi = (int(f * n_fft / sample_rate) for f in band)
+    energy = np.empty(n_frames, dtype=np.float32)
+    flatness = np.empty(n_frames, dtype=np.float32)
+    for first in range(0, n_frames, BLOCK_FRAMES):
+        last = min(first + BLOCK_FRAMES, n_frames)
+        frames = np.asarray(audio[first * frame:last * frame], dtype=np.float32).reshape(-1, frame)
+        energy[first:last] = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        power = np.abs(np.fft.rfft(frames * window, n_fft, axis=1)[:, lo:hi]) ** 2 + 1e-12
+        flatness[first:last] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy, flatness
+
+
+def _runs(mask):
+    # (start, end) index pairs of the True runs in a boolean array
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return edges.reshape(-1, 2)
+
+
+def speech_regions(audio, sample_rate=16000, margin_db=12.0, floor_db=-55.0, headroom_db=30.0,
+                   max_flatness=0.4, min_speech=0.25, min_gap=0.6, pad=0.3):
+    """
+    Finds speech in a mono float array with an energy gate (margin_db above the track's
+    noise floor, and above floor_db) plus a spectral-flatness check that rejects hiss and
+    other noise-like sound. The gate never sits more than headroom_db below the loud
+    parts, so a track with no quiet moments is kept rather than dropped. Gaps shorter
+    than min_gap are bridged, blips shorter than min_speech dropped, and every region
+    padded by pad seconds.
+    Returns a list of (start, end) sample offsets, sorted and non-overlapping.
+    """
+    energy, flatness = frame_features(audio, sample_rate)
+    if not len(energy):
+        return []
+    frame = int(FRAME_SECONDS * sample_rate)
+    quiet, loud = np.percentile(energy, [10, 95])
+    threshold = max(min(quiet + margin_db, loud - headroom_db), floor_db)
+    voiced = (energy > threshold) & (flatness < max_flatness)
+
+    # Bridge short pauses inside sentences, then drop what is still too short
+    for start, end in _runs(~voiced):
+        if start > 0 and end < len(voiced) and (end - start) * FRAME_SECONDS < min_gap:
+            voiced[start:end] = True
+    regions = []
+    pad_samples = int(pad * sample_rate)
+    for start, end in _runs(voiced):
+        if (end - start) * FRAME_SECONDS < min_speech:
+            continue
+        start = max(0, int(start) * frame - pad_samples)
+        end = min(len(audio), int(end) * frame + pad_samples)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def compact(audio, regions):
+    """
+    Concatenates the regions of audio into one array for the transcriber.
+    """
+    if not regions:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate([np.asarray(audio[start:end], dtype=np.float32) for start, end in regions])
+
+
+def remap(segments, regions, sample_rate=16000):
+    """
+    Maps segment timestamps on the compact() timeline back to the original audio.
+    A segment's end is mapped into the region it finishes in, so one spanning a
+    removed gap covers the gap too.
+    """
+    if not regions:
+        return segments
+    starts = np.array([start for start, _ in regions], dtype=np.float64) / sample_rate
+    lengths = np.array([end - start for start, end in regions], dtype=np.float64) / sample_rate
+    compact_starts = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+
+    def to_original(t, side):
+        k = max(int(np.searchsorted(compact_starts, t, side=side)) - 1, 0)
+        return float(starts[k] + min(t - compact_starts[k], lengths[k]))
+
+    return [
+        dict(seg, start=round(to_original(seg["start"], "right"), 3), end=round(to_original(seg["end"], "left"), 3))
+        for seg in segments
+    ]
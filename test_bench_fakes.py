@@ -0,0 +1,82 @@
+import time
+import asyncio
+
+import numpy as np
+
+from benchmarks.fakes import ScriptedTranscriber, PseudoTranslator, SyntheticTTS, pitch_gender, synthetic_soundtrack
+from src.dubber import DubbingEngine
+from src.timeline import Timeline
+
+
+def test_engine_runs_on_fake_backends(tmp_path):
+    engine = DubbingEngine(
+        output_dir=str(tmp_path),
+        checkpoints=False,
+        transcriber=ScriptedTranscriber(segments_per_minute=20),
+        translation_backend=PseudoTranslator(growth=1.5),
+        tts_generator=SyntheticTTS(chars_per_second=10),
+        gender_classifier=pitch_gender,
+    )
+    audio, transcript = synthetic_soundtrack(30, segments_per_minute=20, male_ratio=0.5)
+    segments = engine.transcriber.transcribe(audio)
+    assert [(s["start"], s["end"]) for s in segments] == [(s["start"], s["end"]) for s in transcript]
+
+    spans = [(s["start"], s["end"]) for s in segments]
+    genders = engine._detect_genders(audio, spans)
+    assert [label for label, _ in genders] == ["male" if s["speaker"] == 0 else "female" for s in transcript]
+
+    texts = [s["text"] for s in segments]
+    translated = asyncio.run(engine.translator.translate_batch(texts, dest_lang="es"))
+    assert all(len(out) > len(text) for out, text in zip(translated, texts))
+
+    clip = engine.tts.synthesize("ten chars!", "es", 24000)
+    assert len(clip) == 24000
+
+
+class ReversedTTS(SyntheticTTS):
+    """Later lines answer first, so segments finish in reverse order."""
+    def __init__(self, delays, **kwargs):
+        super().__init__(**kwargs)
+        self.delays = delays
+        self.finished = []
+
+    def synthesize(self, text, language, sample_rate=24000):
+        time.sleep(self.delays.get(text, 0.0))
+        clip = super().synthesize(text, language, sample_rate)
+        self.finished.append(text)
+        return clip
+
+
+def _render_track(engine, speech, segments, duration):
+    async def run():
+        with engine._pools() as pools:
+            genders = engine._start_gender_detection(speech, segments, pools)
+            clips = await engine._render_segments(segments, "es", genders, 24000, pools)
+            timeline = Timeline(duration)
+            placed = await engine._lay_out(timeline, segments, clips, duration, pools, "es")
+            return timeline.samples().copy(), placed
+    return asyncio.run(run())
+
+
+def test_staged_pipeline_output_ignores_completion_order(tmp_path):
+    speech, transcript = synthetic_soundtrack(20, segments_per_minute=30, male_ratio=0.0)
+    segments = [
+        dict(seg, index=i, translated_text=f"{i}: {seg['text']}") for i, seg in enumerate(transcript)
+    ]
+    texts = [seg["translated_text"] for seg in segments]
+    engines = {}
+    for name, concurrency, delays in (
+        ("sequential", 1, {}),
+        ("reversed", len(texts), {text: 0.03 * (len(texts) - i) for i, text in enumerate(texts)}),
+    ):
+        engines[name] = DubbingEngine(
+            output_dir=str(tmp_path / name), checkpoints=False, tts_concurrency=concurrency, cpu_workers=2,
+            tts_generator=ReversedTTS(delays, chars_per_second=12), gender_classifier=pitch_gender,
+        )
+    sequential = _render_track(engines["sequential"], speech, segments, 20.0)
+    reversed_ = _render_track(engines["reversed"], speech, segments, 20.0)
+
+    assert engines["sequential"].tts.generator.finished == texts
+    assert engines["reversed"].tts.generator.finished == texts[::-1]
+    assert np.array_equal(sequential[0], reversed_[0])
+    assert sequential[1] == reversed_[1]
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+
+from src.checkpoints import CheckpointStore, params_key
+
+
+def test_stage_roundtrip_and_param_miss(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    video = tmp_path / "in.mp4"
+    video.write_bytes(b"not really a video")
+    media = store.media_key(str(video))
+
+    segments = [{"start": 0.0, "end": 1.5, "text": "hello"}]
+    store.save(media, "transcript", {"model": "medium"}, segments)
+    assert store.load(media, "transcript", {"model": "medium"}) == segments
+    assert store.load(media, "transcript", {"model": "small"}) is None
+
+    # A half-written checkpoint counts as missing
+    path = store._stage_path(media, "transcript", {"model": "medium"})
+    with open(path, "w") as f:
+        f.write('[{"start": 0.0, "en')
+    assert store.load(media, "transcript", {"model": "medium"}) is None
+
+
+def test_media_key_follows_content(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints"))
+    video = tmp_path / "in.mp4"
+    video.write_bytes(b"a" * 1000)
+    first = store.media_key(str(video))
+    assert store.media_key(str(video)) == first
+
+    video.write_bytes(b"b" * 1000)
+    os.utime(video, ns=(1, 1))
+    assert store.media_key(str(video)) != first
+
+
+def test_clips(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    clip = np.arange(100, dtype=np.int16)
+    assert store.load_clip("k") is None
+    store.save_clip("k", clip)
+    assert np.array_equal(store.load_clip("k"), clip)
+
+
+def test_clips_are_size_bounded(tmp_path):
+    store = CheckpointStore(str(tmp_path), max_clip_bytes=4096)
+    for i in range(20):
+        store.save_clip(f"clip{i}", np.zeros(500, dtype=np.int16))
+    assert sum(f.stat().st_size for f in (tmp_path / "clips").iterdir()) <= 4096
+    assert store.load_clip("clip19") is not None
+    assert store.load_clip("clip0") is None
+
+
+class FlakyBackend:
+    """Upper-cases each line; the first request fails like a dropped connection."""
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, text, source, target):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("network blip")
+        return text.upper()
+
+
+def test_failed_translation_is_not_checkpointed(tmp_path):
+    import asyncio
+    from src.dubber import DubbingEngine
+
+    engine = DubbingEngine(output_dir=str(tmp_path), translation_backend=FlakyBackend())
+    prepared = [{"index": 0, "start": 0.0, "end": 1.0, "literal_text": "hello"}]
+
+    first = asyncio.run(engine._translate_segments(prepared, "es", "media"))
+    # Dubbed from the source line this time, but not saved for the next run
+    assert first[0]["translated_text"] == "hello"
+    assert engine.checkpoints.load("media", "translations", {"lang": "es", "texts": params_key(["hello"])}) is None
+
+    second = asyncio.run(engine._translate_segments(prepared, "es", "media"))
+    assert second[0]["translated_text"] == "HELLO"
+    assert engine.checkpoints.load("media", "translations", {"lang": "es", "texts": params_key(["hello"])}) == ["HELLO"]
+
+
+def test_corrections_follow_their_transcript(tmp_path):
+    import asyncio
+    import pytest
+    from src.dubber import DubbingEngine
+
+    engine = DubbingEngine(output_dir=str(tmp_path), translation_backend=FlakyBackend())
+    video = tmp_path / "in.mp4"
+    video.write_bytes(b"not really a video")
+    with pytest.raises(ValueError):
+        # Nothing to number the segments by yet
+        engine.correct_translation(str(video), "es", 0, "hola")
+
+    segments = [{"start": 0.0, "end": 1.0, "text": "hi"}, {"start": 1.0, "end": 2.0, "text": "bye"}]
+    media = engine.checkpoints.media_key(str(video))
+    engine.checkpoints.save(media, "transcript", engine._transcript_params(), segments)
+    engine.correct_translation(str(video), "es", 1, "adiós")
+    with pytest.raises(ValueError):
+        engine.correct_translation(str(video), "es", 2, "fuera")
+
+    prepared = [dict(seg, index=i, literal_text=seg["text"]) for i, seg in enumerate(segments)]
+    fixed = asyncio.run(engine._translate_segments(prepared, "es", media, params_key(segments)))
+    assert fixed[1]["translated_text"] == "adiós"
+    # A different transcript (another --transcript, VAD toggled...) numbers lines differently
+    other = asyncio.run(engine._translate_segments(prepared, "es", media, params_key(segments[1:])))
+    assert other[1]["translated_text"] != "adiós"
@@ -0,0 +1,39 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from src import profiling
+from src.audio_utils import decode_mp3
+from src.tts import TTSGenerator
+
+
+def _mp3(seconds=1.0, sample_rate=24000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    encoded = io.BytesIO()
+    sf.write(encoded, (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), sample_rate, format="MP3")
+    return encoded.getvalue()
+
+
+class CannedTTS(TTSGenerator):
+    def _fetch_mp3(self, text, language):
+        return _mp3(0.5)
+
+
+def test_decode_mp3_resamples():
+    data = _mp3(1.0)
+    clip = decode_mp3(data, 24000)
+    assert clip.dtype == np.int16
+    # MP3 adds encoder padding, but not much
+    assert abs(len(clip) - 24000) < 3000
+    assert np.abs(clip).max() > 5000
+    assert abs(len(decode_mp3(data, 16000)) - 16000) < 2000
+
+
+def test_tts_decoding_starts_no_processes():
+    profiling.track_subprocesses()
+    before = profiling.subprocess_counts()
+    tts = CannedTTS()
+    clips = [tts.synthesize(f"line {i}", "en", 24000) for i in range(20)]
+    assert all(clip is not None and len(clip) > 10000 for clip in clips)
+    assert profiling.subprocess_counts() == before
@@ -0,0 +1,109 @@
+import json
+import base64
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+
+from src.http_client import HTTPClient, AdaptiveLimiter
+from src.translator import GoogleHTTPBackend, TextTranslator
+from src.tts import HTTPTTSGenerator, TTSGenerator
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        with server.lock:
+            server.ports.add(self.client_address[1])
+            server.hits += 1
+            throttle = server.throttle > 0
+            server.throttle -= 1
+        if throttle:
+            return self._reply(429, b"slow down")
+        if self.path.startswith("/translate_a/single"):
+            text = parse_qs(body)["q"][0]
+            parts = [[line.upper() + "\n", line] for line in text.split("\n")]
+            parts[-1][0] = parts[-1][0].rstrip("\n")
+            return self._reply(200, json.dumps([parts, None, "en"]).encode())
+        audio = base64.b64encode(b"ID3fake-mp3").decode()
+        reply = ')]}\'\n\n[["wrb.fr","jQ1olc","[\\"%s\\"]",null,null,null,"generic"]]' % audio
+        self._reply(200, reply.encode())
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.ports = set()
+    server.hits = 0
+    server.throttle = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def test_limiter_aimd():
+    limiter = AdaptiveLimiter(initial=8, minimum=1, maximum=10)
+    limiter.throttled()
+    assert limiter.limit == 4
+    # About one step up per limit's worth of successes
+    for _ in range(5):
+        limiter.succeeded()
+    assert int(limiter.limit) == 5
+    for _ in range(10):
+        limiter.throttled()
+    assert limiter.limit == 1
+
+
+def test_translation_retries_throttles_over_one_connection():
+    server, url = _serve()
+    try:
+        server.throttle = 2
+        client = HTTPClient(backoff=0.0)
+        translator = TextTranslator(backend=GoogleHTTPBackend(client, base_url=url))
+        assert translator.translate_sync("hello", "es") == "HELLO"
+        assert translator._translate_pack(["one", "two"], "es") == ["ONE", "TWO"]
+        assert server.hits == 4
+        assert client.throttles == 2
+        assert client.limiter.limit < 4
+        # Keep-alive: every request after the throttles reused one connection
+        assert len(server.ports) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_tts_goes_through_client():
+    server, url = _serve()
+    try:
+        tts = HTTPTTSGenerator(client=HTTPClient(backoff=0.0), base_url=url)
+        assert tts._fetch_mp3("hello there", "en") == b"ID3fake-mp3"
+        # Long text is chunked by gTTS, one request per chunk
+        assert tts._fetch_mp3("word " * 60, "en") == b"ID3fake-mp3" * 3
+        assert tts.voice_settings["engine"] == "gtts"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_tts_falls_back_to_public_gtts(monkeypatch):
+    class GarbageClient:
+        def request(self, method, url, **kwargs):
+            return type("Response", (), {"text": "<html>not the RPC reply</html>"})()
+
+    monkeypatch.setattr(TTSGenerator, "_fetch_mp3", lambda self, text, language: b"public")
+    tts = HTTPTTSGenerator(client=GarbageClient(), base_url="http://stub")
+    # The reply format changed
+    assert tts._fetch_mp3("hello", "en") == b"public"
+    # The private request builder is gone
+    monkeypatch.delattr("gtts.gTTS._prepare_requests")
+    assert tts._fetch_mp3("hello", "en") == b"public"
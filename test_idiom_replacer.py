@@ -0,0 +1,41 @@
+import os
+import re
+
+from src.idiom_replacer import IdiomReplacer
+
+IDIOMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "idioms.json")
+
+
+def sequential_replace(replacer, sentence):
+    """The original one-regex-per-idiom implementation, kept as the reference."""
+    for idiom in replacer.sorted_idioms:
+        pattern = re.compile(r'\b' + re.escape(idiom) + r'\b', flags=re.IGNORECASE)
+        if pattern.search(sentence):
+            sentence = pattern.sub(replacer.idioms_dict[idiom], sentence)
+    return sentence
+
+
+def test_matches_sequential_replacement():
+    replacer = IdiomReplacer(IDIOMS_PATH)
+    sentences = [
+        "It was a Piece of Cake, honestly.",
+        "Things can get out of hand quickly.",
+        "Keep an eye on the ball is in your court.",
+        "He was under the weather the storm passed.",
+        "Don't bite the hand that feeds you scratch my back, I'll scratch yours.",
+        "The pieces of cake were gone.",
+        "BREAK THE ICE and then hit the sack",
+        "No idioms here at all.",
+    ]
+    sentences += [f"Well, {idiom}!" for idiom in replacer.sorted_idioms]
+    for sentence in sentences:
+        assert replacer.replace(sentence) == sequential_replace(replacer, sentence), sentence
+
+
+def test_precompiled_index(tmp_path):
+    index_path = str(tmp_path / "idioms.index")
+    IdiomReplacer.build_index(IDIOMS_PATH, index_path)
+    from_json = IdiomReplacer(IDIOMS_PATH)
+    from_index = IdiomReplacer(IDIOMS_PATH, index_path=index_path)
+    assert from_index.trie == from_json.trie
+    assert from_index.replace("Once in a blue moon") == from_json.replace("Once in a blue moon")
@@ -0,0 +1,63 @@
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from src.audio_utils import ingest_audio
+
+needs_ffmpeg = pytest.mark.skipif(
+    not shutil.which("ffmpeg") or not shutil.which("ffprobe"), reason="ffmpeg not available"
+)
+
+
+def _make_video(path, seconds):
+    subprocess.run([
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"sine=f=440:d={seconds}",
+        "-f", "lavfi", "-i", f"color=c=black:s=64x64:d={seconds}",
+        "-shortest", path,
+    ], check=True)
+
+
+@needs_ffmpeg
+def test_ingest_audio(tmp_path):
+    video = str(tmp_path / "in.mp4")
+    _make_video(video, 3)
+
+    samples, info = ingest_audio(video, 16000)
+    assert samples.dtype == np.float32
+    assert abs(info["duration"] - 3) < 0.1
+    assert abs(len(samples) / 16000 - 3) < 0.1
+    assert 0.1 < np.abs(samples).max() <= 1.0
+
+    mapped, _ = ingest_audio(video, 16000, mmap_path=str(tmp_path / "audio.f32"))
+    assert isinstance(mapped, np.memmap)
+    assert np.array_equal(mapped, samples)
+    assert os.path.getsize(tmp_path / "audio.f32") == samples.nbytes
+
+
+@needs_ffmpeg
+def test_merge_audio_video_from_memory(tmp_path):
+    from src.audio_utils import merge_audio_video
+
+    video = str(tmp_path / "in.mp4")
+    _make_video(video, 2)
+    tone = (8000 * np.sin(2 * np.pi * 220 * np.arange(48000) / 24000)).astype(np.int16)
+
+    out = str(tmp_path / "out.mp4")
+    assert merge_audio_video(video, tone, out, 24000)
+    chunked = str(tmp_path / "chunked.mp4")
+    assert merge_audio_video(video, iter([tone[:10000], tone[10000:]]), chunked, 24000, audio_bitrate="64k")
+
+    for path in (out, chunked):
+        samples, info = ingest_audio(path, 24000)
+        assert abs(len(samples) / 24000 - 2) < 0.1
+        assert np.abs(samples).max() > 0.1
+
+
+def test_missing_ffprobe_is_reported(tmp_path, monkeypatch):
+    # Nothing on PATH, so ffprobe can't be started
+    monkeypatch.setenv("PATH", str(tmp_path))
+    assert ingest_audio(str(tmp_path / "in.mp4")) == (None, None)
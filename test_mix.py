@@ -0,0 +1,26 @@
+import numpy as np
+
+from src.mix import duck_envelope, mix_under, CONTROL_HZ
+
+
+def test_envelope_ducks_spans_with_ramps():
+    envelope = duck_envelope([(2.0, 3.0), (2.5, 4.0)], 10.0, duck_db=-20.0, attack_sec=0.1, release_sec=0.5)
+    at = lambda t: envelope[int(t * CONTROL_HZ)]
+    assert np.isclose(at(3.5), 0.1)
+    assert at(0.5) == 1.0 and at(9.0) == 1.0
+    # Attack before the span, slower release after it
+    assert 0.1 < at(1.95) < 1.0 and at(1.85) == 1.0
+    assert 0.1 < at(4.3) < 1.0 and at(4.6) == 1.0
+    assert np.all(np.diff(envelope[int(4.0 * CONTROL_HZ):int(4.6 * CONTROL_HZ)]) >= 0)
+
+
+def test_mix_under_adds_ducked_background():
+    sr = 24000
+    dub = np.zeros(sr * 4, dtype=np.int16)
+    dub[sr:2 * sr] = 1000
+    background = np.full(sr * 4, 0.5, dtype=np.float32)
+    envelope = duck_envelope([(1.0, 2.0)], 4.0, duck_db=-20.0)
+    mix_under(dub, background, envelope, sr)
+    assert abs(int(dub[sr // 2]) - 16384) <= 1
+    assert abs(int(dub[3 * sr // 2]) - (1000 + 1638)) <= 2
+    assert abs(int(dub[7 * sr // 2]) - 16384) <= 1
@@ -0,0 +1,31 @@
+import numpy as np
+
+from utils.pitch import estimate_f0
+
+
+def _tone(f0, seconds=1.0, sr=24000):
+    t = np.arange(int(seconds * sr)) / sr
+    phase = 2 * np.pi * f0 * t
+    return (0.3 * sum(np.sin(k * phase) / k for k in range(1, 6))).astype(np.float32)
+
+
+def test_yin_tracks_steady_pitch():
+    for f0 in (110.0, 220.0):
+        estimate = estimate_f0(_tone(f0), 24000)
+        voiced = estimate[~np.isnan(estimate)]
+        assert len(voiced) > 0.8 * len(estimate)
+        assert abs(np.median(voiced) - f0) / f0 < 0.01
+
+
+def test_analysis_rate_keeps_frame_grid():
+    audio = _tone(180.0)
+    full = estimate_f0(audio, 24000)
+    low = estimate_f0(audio, 24000, analysis_rate=8000)
+    assert len(low) == len(full)
+    assert abs(np.nanmedian(low) - 180.0) / 180.0 < 0.02
+
+
+def test_silence_is_unvoiced():
+    audio = np.concatenate([_tone(200.0, 0.5), np.zeros(12000, dtype=np.float32)])
+    estimate = estimate_f0(audio, 24000)
+    assert np.all(np.isnan(estimate[-5:]))
@@ -0,0 +1,83 @@
+import sys
+import json
+import asyncio
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from src import profiling
+
+
+def test_disabled_is_a_noop():
+    profiling.disable()
+    assert profiling.span("anything") is profiling.span("other", lang="es")
+    with profiling.span("anything"):
+        pass
+    profiling.count("nothing")
+    assert profiling.active() is None
+
+
+def test_spans_summary_and_trace(tmp_path):
+    profiler = profiling.enable()
+    try:
+        with profiling.span("transcribe"):
+            subprocess.run([sys.executable, "-c", "pass"])
+
+        async def segment(i):
+            with profiling.span("segment.tts", "network", index=i):
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(*(segment(i) for i in range(3)))
+
+        asyncio.run(run())
+    finally:
+        profiling.disable()
+
+    summary_path, trace_path = profiler.write(str(tmp_path / "profile.json"))
+    with open(summary_path) as f:
+        summary = json.load(f)
+    assert summary["spans"]["transcribe"]["count"] == 1
+    assert summary["spans"]["segment.tts"]["count"] == 3
+    assert summary["spans"]["segment.tts"]["cat"] == "network"
+    assert any(name.startswith("subprocess.python") for name in summary["counters"])
+
+    with open(trace_path) as f:
+        events = json.load(f)["traceEvents"]
+    phases = [event["ph"] for event in events]
+    assert phases.count("X") == 1
+    assert phases.count("b") == phases.count("e") == 3
+
+
+def _burn(seconds):
+    import time
+    started = time.process_time()
+    while time.process_time() - started < seconds:
+        pass
+    return "done"
+
+
+def test_worker_cpu_is_attached_to_the_span():
+    profiler = profiling.enable()
+    try:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            with profiling.span("segment.fit") as span:
+                result, cpu = pool.submit(profiling.timed_call, _burn, 0.2).result()
+                profiling.add_worker_cpu(span, cpu)
+    finally:
+        profiling.disable()
+    assert result == "done"
+    summary = profiler.summary()
+    # The parent thread only waited; the CPU was spent in the worker
+    assert summary["spans"]["segment.fit"]["cpu_s"] >= 0.2
+    assert summary["worker_cpu_s"] >= 0.2
+
+
+def test_engine_doesnt_install_the_audit_hook(tmp_path):
+    # Audit hooks are permanent, so only profiling may add one; checked in a fresh process
+    code = (
+        "from src.dubber import DubbingEngine; from src import profiling; "
+        f"DubbingEngine(output_dir={str(tmp_path)!r}, checkpoints=False); "
+        "assert not profiling._hook_installed; profiling.enable(); profiling.enable(); "
+        "assert profiling._hook_installed"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.scheduler import plan_slots
+
+
+def test_clips_that_fit_are_untouched():
+    placed, planned, kept = plan_slots([0, 100, 300], [100, 300, 500], [80, 150, 50], 500)
+    # The second clip is longer than its line but the gap before the next one absorbs it
+    assert placed.tolist() == [0, 100, 300]
+    assert planned.tolist() == [80, 150, 50]
+    assert kept.tolist() == [80, 150, 50]
+
+
+def test_lead_then_tempo_cap_then_drift():
+    # 300 samples of audio for a 100 sample gap, with 40 samples of silence before it
+    placed, planned, kept = plan_slots([0, 100, 200], [100, 200, 1000], [60, 300, 50], None, max_tempo=1.5, max_lead=40)
+    assert placed[1] == 60
+    assert planned[1] == 200
+    # The overrun pushes the next line back instead of squeezing harder
+    assert placed[2] == 260 and planned[2] == 50
+
+
+def test_never_runs_past_the_end():
+    rng = np.random.default_rng(0)
+    starts = np.sort(rng.integers(0, 10000, 40))
+    lengths = rng.integers(100, 600, 40)
+    lengths[5] = 0
+    next_starts = np.append(starts[1:], 10000)
+    placed, planned, kept = plan_slots(starts, next_starts, lengths, 10000, max_tempo=1.5, max_lead=50)
+    ends = placed + kept
+    assert ends.max() <= 10000
+    assert (planned <= lengths).all()
+    spoken = lengths > 0
+    # No overlaps between consecutive spoken clips
+    assert (placed[spoken][1:] >= ends[spoken][:-1]).all()
+    assert (lengths[spoken] / planned[spoken] <= 1.5 + 1e-2).all()
+
+
+def test_overfull_track_keeps_tempo_and_lead_limits():
+    # Far more speech than track: the backward pass can't fit everything
+    rng = np.random.default_rng(1)
+    starts = np.sort(rng.integers(0, 5000, 30))
+    lengths = rng.integers(300, 900, 30)
+    next_starts = np.append(starts[1:], 5000)
+    placed, planned, kept = plan_slots(starts, next_starts, lengths, 5000, max_tempo=1.5, max_lead=50)
+
+    assert (planned >= np.ceil(lengths / 1.5)).all()
+    assert (placed >= starts - 50).all()
+    assert (kept <= planned).all() and (kept >= 0).all()
+    ends = placed + kept
+    assert ends.max() <= 5000
+    assert (placed[1:] >= ends[:-1]).all()
+    # Something had to give
+    assert (kept < planned).any()
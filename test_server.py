@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+from src.server import JobQueue, JobRequestHandler
+
+
+class FakeEngine:
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    async def process_languages(self, video_path, outputs, work_dir=None, progress=None):
+        self.calls.append((video_path, list(outputs), work_dir))
+        progress("synthesize", 0.5)
+        # The first job blocks so the others pile up in the queue
+        if len(self.calls) == 1:
+            self.release.wait(5)
+        return {lang: video_path != "bad.mp4" for lang in outputs}
+
+
+def _wait(jobs, job_id, state="done"):
+    for _ in range(200):
+        if jobs.get(job_id)["state"] == state:
+            return jobs.get(job_id)
+        time.sleep(0.01)
+    raise AssertionError(jobs.get(job_id))
+
+
+def test_priority_order_and_workspaces(tmp_path):
+    engine = FakeEngine()
+    jobs = JobQueue(engine, str(tmp_path / "jobs"), workers=1)
+    first = jobs.submit("first.mp4")
+    _wait(jobs, first, "running")
+    low = jobs.submit("low.mp4", priority=0)
+    high = jobs.submit("high.mp4", "hi,ru", priority=5)
+    bad = jobs.submit("bad.mp4", priority=-1)
+    engine.release.set()
+
+    _wait(jobs, low)
+    assert _wait(jobs, bad, "failed")["error"]
+    assert [call[0] for call in engine.calls] == ["first.mp4", "high.mp4", "low.mp4", "bad.mp4"]
+    assert engine.calls[1][1] == ["hi", "ru"]
+    # Every job gets its own workspace
+    assert len({call[2] for call in engine.calls}) == 4
+    assert jobs.get(high)["progress"] == 0.5
+    assert jobs.get(high)["outputs"] == {"hi": "high_dubbed_hi.mp4", "ru": "high_dubbed_ru.mp4"}
+    jobs.stop()
+
+
+def test_finished_jobs_are_pruned(tmp_path):
+    engine = FakeEngine()
+    engine.release.set()
+    jobs = JobQueue(engine, str(tmp_path / "jobs"), max_finished=2)
+    ids = [jobs.submit(f"clip{i}.mp4") for i in range(3)]
+    for _ in range(200):
+        if len(engine.calls) == 3 and all(job["finished"] for job in jobs.list()):
+            break
+        time.sleep(0.01)
+    # Only the two most recent finished jobs are kept
+    assert [job["id"] for job in jobs.list()] == ids[1:]
+
+    # And none once they're older than the TTL
+    jobs.finished_ttl = 60
+    with jobs._lock:
+        for job in jobs._jobs.values():
+            job["finished"] -= 120
+    jobs.submit("later.mp4")
+    assert ids[1] not in [job["id"] for job in jobs.list()]
+    jobs.stop()
+
+
+def test_http_api(tmp_path):
+    engine = FakeEngine()
+    engine.release.set()
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), JobRequestHandler)
+    server.jobs = JobQueue(engine, str(tmp_path / "jobs"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        request = urllib.request.Request(
+            url + "/jobs", data=json.dumps({"input": str(video), "lang": "fr"}).encode(), method="POST"
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 202
+            job_id = json.load(response)["id"]
+
+        _wait(server.jobs, job_id)
+        with urllib.request.urlopen(f"{url}/jobs/{job_id}") as response:
+            job = json.load(response)
+        assert job["state"] == "done" and job["lang"] == "fr"
+
+        missing = urllib.request.Request(url + "/jobs", data=json.dumps({"input": "nope.mp4"}).encode(), method="POST")
+        try:
+            urllib.request.urlopen(missing)
+            assert False, "expected a 400"
+        except urllib.error.HTTPError as e:
+            assert e.code == 400
+    finally:
+        server.shutdown()
+        server.server_close()
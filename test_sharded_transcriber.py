@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from src.transcriber import ShardedTranscriber, stitch_shards
+
+
+def test_shards_cover_audio_at_pauses():
+    sr = 16000
+    rng = np.random.default_rng(0)
+    audio = (0.3 * rng.standard_normal(sr * 50)).astype(np.float32)
+    # Pauses to cut at
+    for pause in (18, 37):
+        audio[pause * sr:(pause + 1) * sr] = 0
+    shards = list(ShardedTranscriber(workers=2, shard_sec=20, overlap_sec=1.0).shards(audio))
+    offsets = [offset for offset, _, _ in shards]
+    assert offsets[0] == 0
+    assert [round(o) for o in offsets[1:]] in ([18, 37], [19, 38], [18, 38], [19, 37])
+    for offset, next_offset, samples in shards[:-1]:
+        assert len(samples) == round((next_offset - offset + 1.0) * sr)
+    assert shards[-1][1] is None and round(shards[-1][0] * sr) + len(shards[-1][2]) == len(audio)
+
+
+def test_stitch_offsets_and_edge_dedup():
+    shards = [
+        (0.0, 30.0, [
+            {"start": 1.0, "end": 4.0, "text": " Hello there."},
+            {"start": 28.0, "end": 30.6, "text": " See you soon."},
+            # In the overlap, transcribed again by the next shard
+            {"start": 30.2, "end": 30.9, "text": " Bye."},
+        ]),
+        (30.0, None, [
+            # Repeats the end of the previous shard
+            {"start": 0.0, "end": 0.5, "text": " see you soon"},
+            {"start": 0.2, "end": 0.9, "text": " Bye."},
+            {"start": 5.0, "end": 7.0, "text": " Next line."},
+        ]),
+    ]
+    stitched = stitch_shards(shards)
+    assert [(seg["start"], seg["end"], seg["text"]) for seg in stitched] == [
+        (1.0, 4.0, " Hello there."),
+        (28.0, 30.6, " See you soon."),
+        (30.2, 30.9, " Bye."),
+        (35.0, 37.0, " Next line."),
+    ]
+
+
+def test_quantize_int8_converts_linear_subclasses():
+    torch = pytest.importorskip("torch")
+    from src.transcriber import quantize_int8
+
+    class Linear(torch.nn.Linear):
+        # Like whisper.model.Linear: casts its weights to the input's dtype
+        def forward(self, x):
+            return torch.nn.functional.linear(x, self.weight.to(x.dtype), None if self.bias is None else self.bias.to(x.dtype))
+
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(Linear(16, 32), torch.nn.GELU(), torch.nn.Sequential(Linear(32, 8, bias=False)))
+    x = torch.randn(4, 16)
+    expected = model(x)
+    quantized = quantize_int8(model)
+    layers = [m for m in quantized.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+    assert len(layers) == 2
+    assert not any(isinstance(m, Linear) for m in quantized.modules())
+    assert torch.allclose(quantized(x), expected, atol=0.05)
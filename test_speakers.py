@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.speakers import speaker_embeddings, cluster_speakers, representative_spans, vote
+
+
+def synthetic_voice(rng, seconds, f0, formants, sample_rate=16000):
+    """Pulse train at f0 through a few formant resonators, a crude stand-in for a voice."""
+    from scipy.signal import lfilter
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    phase = np.cumsum(f0 * (1 + 0.05 * np.sin(2 * np.pi * 3 * t)) / sample_rate)
+    signal = (np.diff(np.floor(phase), prepend=0) > 0).astype(float)
+    for center, bandwidth in formants:
+        r = np.exp(-np.pi * bandwidth / sample_rate)
+        theta = 2 * np.pi * center / sample_rate
+        signal = lfilter([1], [1, -2 * r * np.cos(theta), r * r], signal)
+    signal /= np.abs(signal).max()
+    return 0.5 * signal + 0.01 * rng.standard_normal(len(signal))
+
+
+def test_two_speaker_interview_gives_two_clusters():
+    rng = np.random.default_rng(0)
+    voices = [(115, [(600, 80), (1100, 90), (2500, 120)]), (215, [(850, 80), (1600, 90), (2900, 120)])]
+    parts, spans, speakers, position = [], [], [], 0.0
+    for _ in range(40):
+        speaker = int(rng.integers(2))
+        seconds = float(rng.uniform(0.5, 3.0))
+        parts.append(synthetic_voice(rng, seconds, *voices[speaker]))
+        parts.append(np.zeros(4000))
+        spans.append((position, position + seconds))
+        speakers.append(speaker)
+        position += seconds + 0.25
+    speech = np.concatenate(parts).astype(np.float32)
+
+    labels = cluster_speakers(speaker_embeddings(speech, spans))
+    assert len(set(labels.tolist())) == 2
+    # Same speaker <=> same cluster
+    assert all((labels == labels[i]).tolist() == [s == speakers[i] for s in speakers] for i in range(len(spans)))
+
+    picks = representative_spans(spans, labels, per_cluster=3)
+    assert sorted(picks) == [0, 1] and all(len(members) == 3 for members in picks.values())
+
+
+def test_vote_weights_by_confidence():
+    assert vote([("male", 0.9), ("female", 0.6), ("female", 0.2)]) == ("male", 0.9 / 1.7)
+    assert vote([(None, 0.0)]) == (None, 0.0)
+
+
+def test_silent_track_falls_back_to_per_segment_genders(tmp_path):
+    from src.dubber import DubbingEngine
+
+    def classifier(speech, spans):
+        return [("female", 0.8)] * len(spans)
+
+    engine = DubbingEngine(output_dir=str(tmp_path), checkpoints=False, gender_classifier=classifier)
+    # Identical silent spans: their standardised features are ~0, so cosine distances are NaN
+    spans = [(i, i + 1) for i in range(4)]
+    genders = engine._detect_genders(np.zeros(16000 * 5, dtype=np.float32), spans)
+    assert [label for label, _ in genders] == ["female"] * 4
@@ -0,0 +1,7 @@
+from benchmarks.startup_budget import check_budget
+
+
+def test_startup_does_not_load_models():
+    # Generous limits: this guards against model/ML imports creeping back onto the startup path
+    for name, elapsed, rss_mb, problems in check_budget(max_seconds=15.0, max_rss_mb=500.0):
+        assert not problems, f"{name}: {problems}"
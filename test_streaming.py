@@ -0,0 +1,51 @@
+import subprocess
+import sys
+
+import numpy as np
+import soundfile as sf
+
+from src.streaming import silence_windows
+
+
+def test_windows_cut_in_pauses_and_cover_everything(tmp_path):
+    sr = 16000
+    t = np.arange(30 * sr) / sr
+    audio = (0.3 * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+    # Pauses at 8.5-9s and 18-18.5s, inside the search zone of 10s windows
+    audio[int(8.5 * sr):9 * sr] = 0
+    audio[18 * sr:int(18.5 * sr)] = 0
+    path = tmp_path / "speech.wav"
+    sf.write(path, audio, sr)
+
+    windows = list(silence_windows(str(path), window_sec=10.0, search_sec=3.0))
+    starts = [start for start, _ in windows]
+    assert 8.5 <= starts[1] <= 9.0
+    assert 18.0 <= starts[2] <= 18.5 + 1e-6
+
+    joined = np.concatenate([samples for _, samples in windows])
+    assert len(joined) == len(audio)
+    assert np.allclose(joined, audio, atol=1e-4)
+
+
+def test_windows_from_array_match_file(tmp_path):
+    sr = 16000
+    audio = (0.2 * np.sin(2 * np.pi * 150 * np.arange(25 * sr) / sr)).astype(np.float32)
+    audio[int(9.2 * sr):int(9.6 * sr)] = 0
+    path = tmp_path / "speech.wav"
+    sf.write(path, audio, sr, subtype="FLOAT")
+
+    from_file = list(silence_windows(str(path), window_sec=10.0, search_sec=3.0))
+    from_array = list(silence_windows(audio, window_sec=10.0, search_sec=3.0, sample_rate=sr))
+    assert [start for start, _ in from_file] == [start for start, _ in from_array]
+
+
+def test_pool_workers_dont_hold_mux_pipes_open(tmp_path):
+    from src.dubber import DubbingEngine
+
+    engine = DubbingEngine(output_dir=str(tmp_path), cpu_workers=2, checkpoints=False, process_start_method="fork")
+    with engine._pools() as (_, _, cpu_pool):
+        # Stands in for a mux started before the first CPU job (e.g. every clip from a checkpoint)
+        mux = subprocess.Popen([sys.executable, "-c", "import sys; sys.stdin.read()"], stdin=subprocess.PIPE)
+        assert cpu_pool.submit(abs, -1).result() == 1
+        mux.stdin.close()
+        assert mux.wait(timeout=10) == 0
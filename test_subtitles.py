@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from src.subtitles import load_transcript, parse_subtitles, check_transcript
+
+SRT = """1
+00:00:01,000 --> 00:00:03,500
+<i>Hello there.</i>
+
+2
+00:00:04,250 --> 00:00:06,000
+{\\an8}How are you
+doing today?
+
+3
+00:00:07,000 --> 00:00:08,000
+
+"""
+
+VTT = """WEBVTT
+
+NOTE written by hand
+
+intro
+00:01.000 --> 00:03.500 align:start position:10%
+<v Anna>Hello there.</v>
+
+01:00:04.250 --> 01:00:06.000
+<c.yellow>Still here.</c>
+"""
+
+
+def test_srt():
+    assert parse_subtitles(SRT.replace("\n", "\r\n")) == [
+        {"start": 1.0, "end": 3.5, "text": "Hello there."},
+        {"start": 4.25, "end": 6.0, "text": "How are you doing today?"},
+    ]
+
+
+def test_vtt():
+    assert parse_subtitles(VTT) == [
+        {"start": 1.0, "end": 3.5, "text": "Hello there."},
+        {"start": 3604.25, "end": 3606.0, "text": "Still here."},
+    ]
+
+
+def test_files(tmp_path):
+    srt = tmp_path / "episode.srt"
+    srt.write_text(SRT, encoding="utf-8-sig")
+    assert len(load_transcript(str(srt))) == 2
+
+    whisper = tmp_path / "episode.json"
+    whisper.write_text(json.dumps({"text": "...", "segments": [
+        {"id": 0, "start": 0.0, "end": 2.0, "text": " Hi.", "tokens": [1, 2]},
+        {"id": 1, "start": 2.0, "end": 2.5, "text": " "},
+    ]}))
+    assert load_transcript(str(whisper)) == [{"start": 0.0, "end": 2.0, "text": "Hi."}]
+
+    empty = tmp_path / "empty.vtt"
+    empty.write_text("WEBVTT\n")
+    with pytest.raises(ValueError):
+        load_transcript(str(empty))
+
+
+def test_checked_against_video():
+    segments = parse_subtitles(SRT)
+    assert check_transcript(list(reversed(segments)), 10.0) == segments
+    with pytest.raises(ValueError, match="video is 5.0s"):
+        check_transcript(segments, 5.0, tolerance_sec=0.5)
+    with pytest.raises(ValueError, match="bad timing"):
+        check_transcript([{"start": 3.0, "end": 2.0, "text": "x"}])
+
+
+@pytest.mark.parametrize("segments", [
+    {"start": 0.0, "end": 1.0, "text": "x"},
+    [{"start": 0.0, "text": "x"}],
+    [{"start": "0", "end": 1.0, "text": "x"}],
+    [{"start": 0.0, "end": None, "text": "x"}],
+    [{"start": 0.0, "end": 1.0, "text": None}],
+    ["0 --> 1 x"],
+])
+def test_malformed_segments_are_rejected(segments):
+    with pytest.raises(ValueError):
+        check_transcript(segments)
+
+
+def test_malformed_whisper_json(tmp_path):
+    path = tmp_path / "t.json"
+    path.write_text('{"segments": ["not a segment"]}')
+    with pytest.raises(ValueError, match="bad segment"):
+        load_transcript(str(path))
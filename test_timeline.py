@@ -0,0 +1,71 @@
+import numpy as np
+
+from src.timeline import Timeline
+
+
+def test_place_writes_at_offset_and_grows():
+    timeline = Timeline(1.0, sample_rate=100)
+    clip = np.full(20, 7, dtype=np.int16)
+    assert timeline.place(clip, 0.5) == 0.7
+    assert timeline.end == 70
+    assert np.array_equal(timeline.samples()[50:70], clip)
+    assert not timeline.samples()[:50].any()
+
+    # Past the preallocated second: the buffer grows, earlier clips stay put
+    assert timeline.place(clip, 1.2) == 1.4
+    assert len(timeline.samples()) == 140
+    assert np.array_equal(timeline.samples()[50:70], clip)
+    assert np.array_equal(timeline.samples()[120:140], clip)
+
+    # An earlier clip doesn't move the end back
+    timeline.place(np.ones(5, dtype=np.int16), 0.0)
+    assert timeline.end == 140
+
+
+def test_fit_pads_and_trims():
+    timeline = Timeline(1.0, sample_rate=100)
+    timeline.place(np.full(50, 3, dtype=np.int16), 0.2)
+    timeline.fit(2.0)
+    assert len(timeline.samples()) == 200
+    assert timeline.duration == 2.0
+    assert not timeline.samples()[70:].any()
+
+    timeline.fit(0.5)
+    assert len(timeline.samples()) == 50
+    assert (timeline.samples()[20:] == 3).all()
+    # Trimmed audio doesn't come back when the track is padded again
+    timeline.fit(1.0)
+    assert not timeline.samples()[50:].any()
+
+
+def test_offsets_are_rounded_to_samples():
+    timeline = Timeline(1.0)
+    assert timeline.to_samples(0.333) == 7992
+    assert timeline.to_samples(1 / 3) == 8000
+    # Negative times (early Whisper timestamps) start at zero
+    assert timeline.to_samples(-0.1) == 0
+    timeline.place(np.ones(10, dtype=np.int16), 0.333)
+    assert timeline.samples()[7991] == 0
+    assert timeline.samples()[7992] == 1
+    assert timeline.end == 8002
+
+
+def test_adjacent_and_overlapping_clips():
+    timeline = Timeline(1.0, sample_rate=100)
+    # Back to back: the second clip starts on the first clip's end sample, no gap or overlap
+    end = timeline.place(np.full(10, 1, dtype=np.int16), 0.1)
+    timeline.place(np.full(10, 2, dtype=np.int16), end)
+    assert list(timeline.samples()[9:]) == [0] + [1] * 10 + [2] * 10
+    # Overlap: the later clip overwrites, it isn't mixed in
+    timeline.place(np.full(4, 5, dtype=np.int16), 0.18)
+    assert list(timeline.samples()[17:23]) == [1, 5, 5, 5, 5, 2]
+
+
+def test_samples_stop_at_the_end_not_the_buffer():
+    timeline = Timeline(1.0, sample_rate=100)
+    assert len(timeline.buffer) == 100
+    assert len(timeline.samples()) == 0
+    timeline.place(np.ones(10, dtype=np.int16), 0.3)
+    assert timeline.end == 40
+    assert len(timeline.samples()) == 40
+    assert timeline.duration == 0.4
@@ -0,0 +1,67 @@
+import asyncio
+
+from src.translator import TextTranslator
+from src.translation_cache import TranslationCache
+
+
+class StubBackend:
+    """Offline backend: upper-cases each line and records every request."""
+    def __init__(self, drop_lines=False):
+        self.calls = []
+        self.drop_lines = drop_lines
+
+    def translate(self, text, source, target):
+        self.calls.append(text)
+        if self.drop_lines:
+            text = text.replace("\n", " ")
+        return f"[{target}] " + text.upper().replace("\n", f"\n[{target}] ")
+
+
+def test_batch_is_packed_and_cached(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite"))
+    backend = StubBackend()
+    translator = TextTranslator(backend=backend, cache=cache, pack_size=2)
+    texts = ["hello there", "  hello   there ", "good morning", "", "bye"]
+
+    result = asyncio.run(translator.translate_batch(texts, dest_lang="es"))
+    assert result == ["[es] HELLO THERE", "[es] HELLO THERE", "[es] GOOD MORNING", "", "[es] BYE"]
+    # 3 unique lines in packs of 2
+    assert len(backend.calls) == 2
+
+    # A rerun with a fresh translator is answered from disk
+    backend = StubBackend()
+    translator = TextTranslator(backend=backend, cache=TranslationCache(str(tmp_path / "cache.sqlite")))
+    assert asyncio.run(translator.translate_batch(texts, dest_lang="es")) == result
+    assert backend.calls == []
+    assert translator.stats()["hits"] == 4
+
+
+def test_pack_mismatch_falls_back_to_single_requests(tmp_path):
+    backend = StubBackend(drop_lines=True)
+    translator = TextTranslator(backend=backend, cache=TranslationCache(str(tmp_path / "cache.sqlite")))
+    result = asyncio.run(translator.translate_batch(["one", "two"], dest_lang="fr"))
+    assert result == ["[fr] ONE", "[fr] TWO"]
+    assert len(backend.calls) == 3
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite"), max_bytes=200)
+    for i in range(10):
+        cache.put(f"line {i}", "auto", "es", "x" * 20)
+    assert cache.size_bytes <= 200
+    assert cache.get("line 9", "auto", "es") == "x" * 20
+    assert cache.get("line 0", "auto", "es") is None
+
+
+def test_hits_refresh_recency_without_a_write_each(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite"), max_bytes=200)
+    cache.put("old", "auto", "es", "x" * 20)
+    cache.put("new", "auto", "es", "x" * 20)
+    changes = cache._conn.total_changes
+    assert cache.get("old", "auto", "es") == "x" * 20
+    assert cache._conn.total_changes == changes
+    # The pending hit is written before eviction, so "new" is the least recently used now
+    cache.put("third", "auto", "es", "x" * 20)
+    assert cache.get("old", "auto", "es") == "x" * 20
+    assert cache.get("new", "auto", "es") is None
+    cache.close()
@@ -0,0 +1,53 @@
+import numpy as np
+
+from src.tts_cache import TTSCache, CachedTTS
+
+
+class StubGenerator:
+    """Offline TTS: one sample per character, records every call."""
+    voice_settings = {"engine": "stub"}
+
+    def __init__(self):
+        self.calls = []
+
+    def synthesize(self, text, language, sample_rate):
+        self.calls.append(text)
+        return np.arange(len(text), dtype=np.int16)
+
+
+def test_repeated_lines_skip_synthesis(tmp_path):
+    generator = StubGenerator()
+    tts = CachedTTS(generator, TTSCache(str(tmp_path), memory_bytes=0))
+    first = tts.synthesize("Thank you.", "es", 24000)
+    second = tts.synthesize("  Thank   you. ", "es", 24000)
+    other_lang = tts.synthesize("Thank you.", "hi", 24000)
+
+    assert np.array_equal(first, second)
+    assert generator.calls == ["Thank you.", "Thank you."]
+    assert len(other_lang) == len(first)
+    assert tts.stats()["hits"] == 1
+
+    # A new process reads the decoded PCM back from disk
+    generator = StubGenerator()
+    tts = CachedTTS(generator, TTSCache(str(tmp_path)))
+    assert np.array_equal(tts.synthesize("Thank you.", "es", 24000), first)
+    assert generator.calls == []
+
+
+def test_disk_tier_is_size_bounded(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=4096, memory_bytes=0)
+    for i in range(20):
+        cache.put(cache.make_key(f"line {i}", "es", 24000), np.zeros(500, dtype=np.int16))
+    assert cache.stats()["bytes"] <= 4096
+    assert cache.get(cache.make_key("line 19", "es", 24000)) is not None
+    assert cache.get(cache.make_key("line 0", "es", 24000)) is None
+
+
+def test_put_leaves_the_callers_array_writable(tmp_path):
+    cache = TTSCache(str(tmp_path))
+    samples = np.arange(10, dtype=np.int16)
+    cache.put("key", samples)
+    samples[0] = 99
+    cached = cache.get("key")
+    assert cached[0] == 0
+    assert not cached.flags.writeable
@@ -0,0 +1,38 @@
+import numpy as np
+
+from benchmarks.fakes import synthetic_soundtrack
+from src.vad import speech_regions, compact, remap
+
+
+def test_regions_cover_speech_and_skip_noise():
+    audio, transcript = synthetic_soundtrack(60, segments_per_minute=10)
+    # Ten seconds of loud hiss with no speech in it
+    rng = np.random.default_rng(0)
+    audio[20 * 16000:30 * 16000] = 0.2 * rng.standard_normal(10 * 16000)
+    audio = audio.astype(np.float32)
+    regions = speech_regions(audio)
+
+    kept = sum(end - start for start, end in regions)
+    assert kept < 0.8 * len(audio)
+    for seg in transcript:
+        if seg["end"] < 20 or seg["start"] > 30:
+            assert any(start <= seg["start"] * 16000 and seg["end"] * 16000 <= end for start, end in regions)
+    assert not any(start < 29 * 16000 and end > 21 * 16000 for start, end in regions)
+
+
+def test_silence_has_no_regions():
+    assert speech_regions(np.zeros(16000 * 5, dtype=np.float32)) == []
+    assert len(compact(np.zeros(10), [])) == 0
+
+
+def test_track_without_quiet_parts_is_kept():
+    tone = 0.3 * np.sin(2 * np.pi * 200 * np.arange(16000 * 5) / 16000)
+    assert speech_regions(tone.astype(np.float32)) == [(0, 16000 * 5)]
+
+
+def test_remap_back_to_original_timeline():
+    regions = [(16000, 48000), (160000, 192000)]
+    audio = np.arange(200000, dtype=np.float32)
+    assert len(compact(audio, regions)) == 64000
+    segments = [{"start": 0.5, "end": 1.5, "text": "a"}, {"start": 2.0, "end": 3.5, "text": "b"}, {"start": 1.5, "end": 2.5, "text": "c"}]
+    assert [(seg["start"], seg["end"]) for seg in remap(segments, regions)] == [(1.5, 2.5), (10.0, 11.5), (2.5, 10.5)]
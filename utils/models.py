@@ -0,0 +1,64 @@
+import os
+import threading
+
+# Heavy libraries (torch, transformers, whisper) are imported inside the loaders,
+# so importing this module (or anything that uses it) stays cheap.
+
+GENDER_MODEL_NAME = "prithivMLmods/Common-Voice-Geneder-Detection"
+
+_models = {}
+_lock = threading.RLock()
+
+def get_model(key, loader):
+    """
+    Returns the model registered under key, calling loader() the first time it is requested.
+    """
+    with _lock:
+        if key not in _models:
+            _models[key] = loader()
+        return _models[key]
+
+def is_loaded(key):
+    return key in _models
+
+def whisper_model(size="medium"):
+    def load():
+        import whisper
+        print(f"Loading Whisper model ({size})...")
+        return whisper.load_model(size)
+    return get_model(("whisper", size), load)
+
+def whisper_weights_path(size="medium"):
+    """
+    Path of a copy of the Whisper checkpoint in torch's zip format, which torch.load
+    can memory-map, so worker processes share one read-only copy of the weights
+    through the page cache. Written next to Whisper's own download the first time,
+    from a model loaded with the public whisper.load_model (which downloads it if needed).
+    """
+    def convert():
+        import dataclasses
+        import torch
+        import whisper
+        root = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper")
+        path = os.path.join(root, f"{size}.mmap.pt")
+        if not os.path.exists(path):
+            print(f"Preparing shared Whisper weights ({size})...")
+            # Loaded once here and dropped again; float32, which is what the CPU workers run
+            model = whisper.load_model(size, device="cpu", download_root=root)
+            torch.save({"dims": dataclasses.asdict(model.dims), "model_state_dict": model.state_dict()}, path + ".tmp")
+            del model
+            os.replace(path + ".tmp", path)
+        return path
+    return get_model(("whisper-weights", size), convert)
+
+def gender_classifier():
+    """
+    Returns (model, feature_extractor) for the Wav2Vec2 gender classifier.
+    """
+    def load():
+        from transformers import Wav2Vec2ForSequenceClassification, Wav2Vec2FeatureExtractor
+        print("Loading gender detection model...")
+        model = Wav2Vec2ForSequenceClassification.from_pretrained(GENDER_MODEL_NAME)
+        processor = Wav2Vec2FeatureExtractor.from_pretrained(GENDER_MODEL_NAME)
+        return model, processor
+    return get_model(("gender", GENDER_MODEL_NAME), load)
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Same analysis defaults female_to_male has always used with pyin
+FRAME_LENGTH = 1024
+FMIN = 65.40639132514966  # librosa.note_to_hz('C2')
+FMAX = 523.2511306011972  # librosa.note_to_hz('C5')
+
+def _frames(audio, frame_length, hop_length):
+    # Centered frames, like librosa, so frame t is around sample t * hop_length
+    padded = np.pad(audio, frame_length // 2)
+    return np.lib.stride_tricks.sliding_window_view(padded, frame_length)[::hop_length]
+
+def yin_f0(audio, sr, frame_length=FRAME_LENGTH, hop_length=None, fmin=FMIN, fmax=FMAX, threshold=0.15, silence_db=-50.0):
+    """
+    Vectorized YIN F0 tracker. All frames are processed at once with FFT-based
+    autocorrelation; there is no per-frame Python loop and no Viterbi decoding.
+    Returns f0 per frame in Hz, NaN where the frame is unvoiced or silent.
+    """
+    hop_length = hop_length or frame_length // 4
+    audio = np.asarray(audio, dtype=np.float64)
+    tau_min = max(int(sr / fmax), 1)
+    tau_max = min(int(np.ceil(sr / fmin)), frame_length - 2)
+    window = frame_length - tau_max
+    frames = _frames(audio, frame_length, hop_length)
+    n_frames = len(frames)
+    if n_frames == 0 or window <= 0:
+        return np.full(n_frames, np.nan)
+
+    # Difference function d(tau) = E(0) + E(tau) - 2 r(tau) over a window of `window` samples
+    n_fft = 1 << (frame_length + window - 1).bit_length()
+    spectrum = np.fft.rfft(frames, n_fft)
+    head = np.fft.rfft(frames[:, :window], n_fft)
+    acf = np.fft.irfft(spectrum * np.conj(head), n_fft)[:, :tau_max + 1]
+    energy = np.cumsum(np.pad(frames ** 2, ((0, 0), (1, 0))), axis=1)
+    e0 = energy[:, window:window + 1]
+    e_tau = energy[:, window:window + tau_max + 1] - energy[:, :tau_max + 1]
+    diff = np.maximum(e0 + e_tau - 2 * acf, 0.0)
+
+    # Cumulative mean normalized difference
+    taus = np.arange(tau_max + 1)
+    cmnd = np.ones_like(diff)
+    running = np.cumsum(diff[:, 1:], axis=1)
+    cmnd[:, 1:] = diff[:, 1:] * taus[1:] / np.maximum(running, 1e-12)
+
+    # First dip under the threshold (at its local minimum), else the global minimum
+    search = cmnd[:, tau_min:tau_max + 1]
+    below = search < threshold
+    first = np.where(below.any(axis=1), below.argmax(axis=1), search.argmin(axis=1))
+    rows = np.arange(n_frames)
+    # Walk down to the bottom of the dip
+    for _ in range(tau_max):
+        step = (first + 1 < search.shape[1])
+        step[step] = search[rows[step], first[step] + 1] < search[rows[step], first[step]]
+        if not step.any():
+            break
+        first = first + step
+    best = first + tau_min
+    aperiodicity = cmnd[rows, best]
+
+    # Parabolic interpolation for sub-sample lag precision
+    left = cmnd[rows, np.maximum(best - 1, 0)]
+    right = cmnd[rows, np.minimum(best + 1, tau_max)]
+    denominator = left - 2 * aperiodicity + right
+    shift = np.where(np.abs(denominator) > 1e-12, 0.5 * (left - right) / np.where(denominator == 0, 1, denominator), 0.0)
+    f0 = sr / (best + np.clip(shift, -1, 1))
+
+    level = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12)
+    unvoiced = (aperiodicity > 2 * threshold) | (level < level.max() + silence_db) | (f0 < fmin) | (f0 > fmax)
+    f0[unvoiced] = np.nan
+    return f0
+
+def pyin_f0(audio, sr, frame_length=FRAME_LENGTH, hop_length=None, fmin=FMIN, fmax=FMAX):
+    """
+    librosa's probabilistic YIN. Most accurate, but its Viterbi decoding is slow.
+    """
+    import librosa
+    f0, _, _ = librosa.pyin(audio, frame_length=frame_length, hop_length=hop_length, sr=sr, fmin=fmin, fmax=fmax)
+    return f0
+
+F0_ESTIMATORS = {
+    "yin": yin_f0,
+    "pyin": pyin_f0,
+}
+
+def estimate_f0(audio, sr, method="yin", frame_length=FRAME_LENGTH, hop_length=None, fmin=FMIN, fmax=FMAX, analysis_rate=None):
+    """
+    Estimates F0 per frame (NaN when unvoiced) with a pluggable tracker.
+    method: a key of F0_ESTIMATORS or a callable with the same signature as yin_f0.
+    analysis_rate: if lower than sr, the audio is resampled to it for analysis and the
+    contour is interpolated back onto the frame grid at sr. Voice pitch sits far below
+    8 kHz, so analysing there loses very little and makes every FFT cheaper.
+    """
+    estimator = F0_ESTIMATORS[method] if isinstance(method, str) else method
+    hop_length = hop_length or frame_length // 4
+    n_frames = 1 + len(audio) // hop_length
+
+    if not analysis_rate or analysis_rate >= sr:
+        return estimator(audio, sr, frame_length=frame_length, hop_length=hop_length, fmin=fmin, fmax=fmax)[:n_frames]
+
+    from math import gcd
+    from scipy.signal import resample_poly
+    divisor = gcd(int(sr), int(analysis_rate))
+    low = resample_poly(audio, int(analysis_rate) // divisor, int(sr) // divisor)
+    scale = analysis_rate / sr
+    low_frame = max(int(round(frame_length * scale)), 2)
+    low_hop = max(int(round(hop_length * scale)), 1)
+    f0_low = estimator(low, analysis_rate, frame_length=low_frame, hop_length=low_hop, fmin=fmin, fmax=fmax)
+
+    # Interpolate voiced values onto the original frame times; keep unvoiced frames NaN
+    times = np.arange(n_frames) * hop_length / sr
+    low_times = np.arange(len(f0_low)) * low_hop / analysis_rate
+    voiced = ~np.isnan(f0_low)
+    if not voiced.any():
+        return np.full(n_frames, np.nan)
+    f0 = np.interp(times, low_times[voiced], f0_low[voiced])
+    nearest = np.clip(np.round(times * analysis_rate / low_hop).astype(int), 0, len(f0_low) - 1)
+    f0[~voiced[nearest]] = np.nan
+    return f0
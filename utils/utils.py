@@ -1,54 +1,87 @@
 import soundfile as sf
-import librosa
-import psola
 import numpy as np
-import scipy.signal
-FRAME_LENGTH = 1024
-FMIN = librosa.note_to_hz('C2')
-FMAX = librosa.note_to_hz('C5')
+from .models import gender_classifier
+from .pitch import estimate_f0, FRAME_LENGTH, FMIN, FMAX
+# psola, scipy and torch are imported where they're used so importing
+# this module doesn't pay for them (see benchmarks/startup_budget.py)
 
-def female_to_male(input_wav: str, output_wav: str, pitch_factor: float = None):
-    audio, sr = sf.read(input_wav)
+def female_to_male_array(audio, sr, pitch_factor: float = None, f0_method="yin", analysis_rate=None):
+    """
+    In-memory female_to_male: takes and returns a mono float array at sr.
+    f0_method: "yin" (fast, vectorized) or "pyin" (librosa, slow), see utils.pitch.
+    analysis_rate: optionally track F0 on a downsampled copy, e.g. 8000.
+    """
+    import psola
+    import scipy.signal
     if audio.ndim > 1:
-        audio = audio[0, :]  # Use first channel if stereo
-    f0, _, _ = librosa.pyin(audio, frame_length=FRAME_LENGTH, sr=sr, fmin=FMIN, fmax=FMAX)
+        audio = audio[:, 0]  # Use first channel if stereo
+    f0 = estimate_f0(audio, sr, method=f0_method, frame_length=FRAME_LENGTH, fmin=FMIN, fmax=FMAX, analysis_rate=analysis_rate)
     nans = np.isnan(f0)
     if np.any(~nans):
         f0[nans] = np.interp(np.flatnonzero(nans), np.flatnonzero(~nans), f0[~nans])
     else:
-        f0[:] = FMIN  # fallback if pyin fails
+        f0[:] = FMIN  # fallback if pitch tracking fails
     avg_f0 = np.mean(f0)
     # is_female = avg_f0 > 160  # typical female F0 > 160Hz
-    # if not is_female:
-    #    print(f"DEBUG: female_to_male - Skipped because avg_f0 {avg_f0} <= 160")
-    #    sf.write(output_wav, audio, sr)
-    #    return
     if pitch_factor is None:
         pitch_factor = 110 / avg_f0
     shifted_f0 = scipy.signal.medfilt(f0 * pitch_factor, kernel_size=11)
-    male_audio = psola.vocode(audio, sample_rate=int(sr), target_pitch=shifted_f0, fmin=FMIN, fmax=FMAX)
+    return psola.vocode(audio, sample_rate=int(sr), target_pitch=shifted_f0, fmin=FMIN, fmax=FMAX)
+
+def female_to_male(input_wav: str, output_wav: str, pitch_factor: float = None, f0_method="yin"):
+    audio, sr = sf.read(input_wav)
+    male_audio = female_to_male_array(audio, sr, pitch_factor=pitch_factor, f0_method=f0_method)
     sf.write(output_wav, male_audio, sr)
 
-import torch
-from transformers import Wav2Vec2ForSequenceClassification, Wav2Vec2FeatureExtractor
-model_name = "prithivMLmods/Common-Voice-Geneder-Detection"
-model = Wav2Vec2ForSequenceClassification.from_pretrained(model_name)
-processor = Wav2Vec2FeatureExtractor.from_pretrained(model_name)
 id2label = {
 "0": "female",
 "1": "male"}
-def get_gender_from_audio(audio_path):
+# Wav2Vec2's convolutional front end needs at least this many samples
+MIN_GENDER_SAMPLES = 400
+
+def classify_gender_batch(speech, spans, sample_rate=16000, batch_size=16, max_seconds=10.0):
+    """
+    Classifies the speaker gender of many spans of one in-memory 16 kHz mono float array.
+    spans: list of (start_sec, end_sec).
+    Returns one (label, confidence) per span, in order; (None, 0.0) for spans too short to classify.
 
+    Spans are sorted by length and batched so each padded batch holds clips of similar
+    length, and the model runs once per batch. Spans longer than max_seconds are center-cropped.
+    """
+    import torch
+    model, processor = gender_classifier()
+    results = [(None, 0.0)] * len(spans)
+    max_samples = int(max_seconds * sample_rate) if max_seconds else None
+
+    clips = []
+    for i, (start, end) in enumerate(spans):
+        a = max(int(start * sample_rate), 0)
+        b = min(int(end * sample_rate), len(speech))
+        if b - a < MIN_GENDER_SAMPLES:
+            continue
+        if max_samples and b - a > max_samples:
+            a += (b - a - max_samples) // 2
+            b = a + max_samples
+        clips.append((b - a, i, speech[a:b]))
+    clips.sort(key=lambda clip: clip[0])
+
+    for k in range(0, len(clips), batch_size):
+        batch = clips[k:k + batch_size]
+        inputs = processor(
+            [clip for _, _, clip in batch],
+            sampling_rate=sample_rate,
+            return_tensors="pt",
+            padding=True
+        )
+        with torch.no_grad():
+            probs = torch.nn.functional.softmax(model(**inputs).logits, dim=-1)
+        confidences, labels = probs.max(dim=-1)
+        for (_, i, _), confidence, label in zip(batch, confidences.tolist(), labels.tolist()):
+            results[i] = (id2label[str(label)], round(confidence, 3))
+    return results
+
+def get_gender_from_audio(audio_path):
+    import librosa
     speech, sample_rate = librosa.load(audio_path, sr=16000)
-    inputs = processor(
-        speech,
-        sampling_rate=sample_rate,
-        return_tensors="pt",
-        padding=True
-    )
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-        probs = torch.nn.functional.softmax(logits, dim=1).squeeze().tolist()
-    prediction = {id2label[str(i)]: round(probs[i], 3) for i in range(len(probs))}
-    return max(prediction, key=prediction.get)
\ No newline at end of file
+    label, _ = classify_gender_batch(speech, [(0, len(speech) / sample_rate)], sample_rate=sample_rate, max_seconds=None)[0]
+    return label